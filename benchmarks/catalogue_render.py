@@ -0,0 +1,143 @@
+"""
+Render-time benchmark for the club catalogue cards.
+
+Renders the cards of N clubs three ways and reports the time taken:
+
+    uncached  every card rendered from the template, as before caching
+    cold      first pass through the fragment cache (render and store)
+    warm      second pass, every card served from the cache
+
+Each size is run against the local-memory and the file-based cache:
+
+    python benchmarks/catalogue_render.py
+    python benchmarks/catalogue_render.py --sizes 1000 10000 --backend file
+
+The clubs are built in memory, so no database or running server is
+needed. The catalogue itself is paginated, so a page only renders a
+couple of dozen cards; rendering thousands in one batch measures the
+per-card cost at district scale.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as clock, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'school_clubs_events.settings')
+os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:')
+os.environ.setdefault('SECRET_KEY', 'catalogue-render-benchmark')
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+
+def configure(cache_dir, largest):
+    import django
+    from django.conf import settings
+
+    # Room for every card, so the warm pass never hits a culled entry
+    options = {'MAX_ENTRIES': largest * 2}
+    settings.CACHES = {
+        'default': {'BACKEND': BACKENDS['locmem'], 'OPTIONS': options},
+        'file': {
+            'BACKEND': BACKENDS['file'],
+            'LOCATION': cache_dir,
+            'OPTIONS': options,
+        },
+    }
+    django.setup()
+
+
+def build_clubs(count):
+    from club.models import Club
+    from user.models import User
+
+    stamp = datetime(2025, 9, 1, tzinfo=timezone.utc)
+    teacher = User(
+        pk=1, first_name='Alice', surname='Smith', role='teacher',
+        updated_at=stamp
+    )
+    return [
+        Club(
+            pk=pk,
+            teacher=teacher,
+            name=f'Club {pk}',
+            club_or_event='club',
+            description='After-school activity for all year groups. ' * 4,
+            min_age=5,
+            max_age=11,
+            capacity=20,
+            start_time=clock(15, 0),
+            end_time=clock(16, 0),
+            start_date=date(2025, 9, 1),
+            end_date=date(2025, 12, 1),
+            frequency='weekly',
+            updated_at=stamp,
+        )
+        for pk in range(1, count + 1)
+    ]
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def run(size, backend):
+    from django.core.cache import caches
+    from django.template.loader import render_to_string
+    from club import cards
+
+    clubs = build_clubs(size)
+    backend_cache = caches['default' if backend == 'locmem' else 'file']
+    backend_cache.clear()
+
+    # Point the card cache at the backend being measured
+    original = cards.cache
+    cards.cache = backend_cache
+    try:
+        uncached = timed(lambda: [
+            render_to_string(cards.CARD_TEMPLATE, {'club': club})
+            for club in clubs
+        ])
+        cold = timed(lambda: cards.attach_card_html(clubs))
+        warm = timed(lambda: cards.attach_card_html(clubs))
+    finally:
+        cards.cache = original
+        backend_cache.clear()
+    return uncached, cold, warm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[1000, 10000, 50000]
+    )
+    parser.add_argument(
+        '--backend', choices=sorted(BACKENDS), action='append'
+    )
+    args = parser.parse_args()
+    backends = args.backend or ['locmem', 'file']
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        configure(cache_dir, max(args.sizes))
+        print(f"{'clubs':>7} {'backend':>8} {'uncached':>11} "
+              f"{'cold':>11} {'warm':>11} {'speedup':>8}")
+        for size in args.sizes:
+            for backend in backends:
+                uncached, cold, warm = run(size, backend)
+                print(
+                    f"{size:>7} {backend:>8} {uncached:>9.0f}ms "
+                    f"{cold:>9.0f}ms {warm:>9.0f}ms "
+                    f"{uncached / warm:>7.1f}x"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Concurrent-request benchmark for the enrollment views.
+
+Runs the same enrollment POST many times in parallel against a running
+server and reports throughput and latency. Compare the WSGI views with
+the async ones by running it once per deployment profile:
+
+    # WSGI (Procfile)
+    gunicorn school_clubs_events.wsgi --workers 2
+    python benchmarks/enrollment_throughput.py --view sync ...
+
+    # ASGI (Procfile.asgi)
+    gunicorn school_clubs_events.asgi:application --workers 2 \\
+        -k uvicorn.workers.UvicornWorker
+    python benchmarks/enrollment_throughput.py --view async ...
+
+Both runs need a parent account, one of their children and a club id.
+Set ENROLLMENT_ADMISSION_RATE high on the server so the waiting room
+does not throttle the sync view. After the first request the child is
+already enrolled, so the rest measure the full validation path.
+
+Only the standard library is used.
+"""
+import argparse
+import re
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+
+VIEW_PATHS = {
+    'sync': '/enrollments/create/{club}/',
+    'async': '/enrollments/async/create/{club}/',
+}
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def build_opener(cookies):
+    return urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(cookies), NoRedirect()
+    )
+
+
+def csrf_token(cookies):
+    for cookie in cookies:
+        if cookie.name == 'csrftoken':
+            return cookie.value
+    raise SystemExit('No CSRF cookie was set.')
+
+
+def log_in(opener, cookies, base_url, email, password):
+    page = opener.open(base_url + '/login/').read().decode()
+    token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', page)
+    data = urllib.parse.urlencode({
+        'csrfmiddlewaretoken': token.group(1),
+        'username': email,
+        'password': password,
+    }).encode()
+    try:
+        opener.open(base_url + '/login/', data)
+    except urllib.error.HTTPError as error:
+        if error.code != 302:
+            raise SystemExit(f'Login failed with HTTP {error.code}.')
+
+
+def post_once(opener, url, data, referer):
+    request = urllib.request.Request(url, data, headers={'Referer': referer})
+    start = time.perf_counter()
+    try:
+        status = opener.open(request).status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    return time.perf_counter() - start, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--view', choices=VIEW_PATHS, default='sync')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--club', type=int, required=True)
+    parser.add_argument('--child', type=int, required=True)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    cookies = CookieJar()
+    opener = build_opener(cookies)
+    base_url = args.base_url.rstrip('/')
+    log_in(opener, cookies, base_url, args.email, args.password)
+
+    url = base_url + VIEW_PATHS[args.view].format(club=args.club)
+    data = urllib.parse.urlencode({
+        'csrfmiddlewaretoken': csrf_token(cookies),
+        'child': args.child,
+        'club': args.club,
+    }).encode()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda _: post_once(opener, url, data, base_url + '/'),
+            range(args.requests)
+        ))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    statuses = Counter(status for _, status in results)
+    percentile = statistics.quantiles(latencies, n=100)
+    print(f'{args.view} view: {url}')
+    print(f'  requests     {args.requests} at concurrency '
+          f'{args.concurrency}')
+    print(f'  throughput   {args.requests / elapsed:.1f} req/s')
+    print(f'  latency p50  {percentile[49] * 1000:.1f} ms')
+    print(f'  latency p95  {percentile[94] * 1000:.1f} ms')
+    print(f'  latency p99  {percentile[98] * 1000:.1f} ms')
+    print(f'  statuses     {dict(statuses)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 from django import forms
 from .models import Child
+from club.models import Club
 from datetime import date
 import re
 
@@ -76,3 +77,72 @@ class ChildForm(forms.ModelForm):
                 self.add_error(None, 'This child is already registered.')
 
         return cleaned_data
+
+
+class ClubFilterForm(forms.Form):
+    """
+    Optional filters for the club catalogue, read from the query string.
+    """
+    q = forms.CharField(
+        max_length=100,
+        required=False,
+        label='Search'
+    )
+    club_or_event = forms.ChoiceField(
+        choices=[('', 'Any')] + Club.CLUB_OR_EVENT_CHOICES,
+        required=False,
+        label='Type'
+    )
+    frequency = forms.ChoiceField(
+        choices=[('', 'Any')] + Club.FREQUENCY_CHOICES,
+        required=False
+    )
+    age = forms.IntegerField(
+        min_value=0,
+        max_value=18,
+        required=False,
+        label='Suitable for age'
+    )
+    date_from = forms.DateField(
+        required=False,
+        label='From',
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    date_to = forms.DateField(
+        required=False,
+        label='To',
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            self.add_error('date_to', 'End date must be after start date.')
+        return cleaned_data
+
+    @property
+    def search_text(self):
+        """
+        The cleaned search text, or '' when there is none to search for.
+        """
+        if not self.is_valid():
+            return ''
+        return self.cleaned_data['q'].strip()
+
+    def filter(self, clubs):
+        """
+        Narrow a club queryset by whichever filters were given.
+        Invalid filters are ignored; search text is applied separately.
+        """
+        if not self.is_valid():
+            return clubs
+        data = self.cleaned_data
+        if data['club_or_event']:
+            clubs = clubs.filter(club_or_event=data['club_or_event'])
+        if data['frequency']:
+            clubs = clubs.filter(frequency=data['frequency'])
+        if data['age'] is not None:
+            clubs = clubs.suitable_for_age(data['age'])
+        return clubs.running_between(data['date_from'], data['date_to'])
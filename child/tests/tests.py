@@ -1,4 +1,5 @@
 from django.test import TestCase
+from unittest import mock
 from django.urls import reverse
 from child.models import Child
 from user.models import User
@@ -230,3 +231,85 @@ class EnrollmentViewTests(TestCase):
                 club=self.club
                 ).exists()
         )
+
+
+class ClubCatalogueTests(TestCase):
+
+    def setUp(self):
+        """Create a parent and a spread of clubs across several days."""
+        self.parent = User.objects.create_user(
+            email='parent@example.com',
+            password='TestPass123!',
+            first_name='John',
+            surname='Doe',
+            role='parent'
+        )
+        self.teacher = User.objects.create_user(
+            email='teacher@example.com',
+            password='Teacher123!',
+            first_name='Alice',
+            surname='Smith',
+            role='teacher'
+        )
+        for i in range(5):
+            Club.objects.create(
+                teacher=self.teacher,
+                name=f'Club {i}',
+                club_or_event='club' if i % 2 else 'event',
+                capacity=10,
+                min_age=4 + i,
+                max_age=10,
+                start_date=date(2025, 9, 1 + i // 2),
+                start_time=time(15, 0),
+                end_time=time(16, 0)
+            )
+        self.url = reverse('child:view_all_clubs')
+        self.client.login(email='parent@example.com', password='TestPass123!')
+
+    @mock.patch('club.catalogue.PAGE_SIZE', 2)
+    def test_keyset_pages_cover_every_club_once(self):
+        """Following the next page links lists each club exactly once."""
+        names = []
+        query = ''
+        while query is not None:
+            response = self.client.get(f'{self.url}?{query}')
+            names += [club.name for club in response.context['clubs']]
+            query = response.context['next_page_query']
+        self.assertEqual(names, [f'Club {i}' for i in range(5)])
+
+    def test_filters_narrow_the_catalogue(self):
+        """Type and age filters are applied on the server."""
+        response = self.client.get(
+            self.url, {'club_or_event': 'club', 'age': 6}
+        )
+        self.assertEqual(
+            [club.name for club in response.context['clubs']],
+            ['Club 1']
+        )
+
+    def test_catalogue_query_count_is_constant(self):
+        """Teachers and eligibility are batched, so more clubs and
+        children cost no extra queries."""
+        for name, year in (('Tom', date.today().year - 10),
+                           ('Amy', date.today().year - 5)):
+            Child.objects.create(
+                first_name=name,
+                surname='Doe',
+                date_of_birth=date(year, 1, 1),
+                emergency_contact_name='Jane Doe',
+                emergency_contact_phone='+447123456789',
+                parent=self.parent
+            )
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Tom: Eligible')
+        self.assertContains(response, 'Amy: Too young')
+
+    def test_search_the_catalogue(self):
+        """Search text returns matching clubs within the active filters."""
+        Club.objects.filter(name='Club 3').update(name='Chess Club')
+        response = self.client.get(self.url, {'q': 'chess'})
+        self.assertEqual(
+            [club.name for club in response.context['clubs']],
+            ['Chess Club']
+        )
@@ -1,15 +1,22 @@
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
 from datetime import date
-from .forms import ChildForm
+from .forms import ChildForm, ClubFilterForm
 from .models import Child
+from club.cards import attach_card_html
+from club.catalogue import catalogue_page
+from club.search import search_clubs
+from enrollment.validation import eligibility_matrix
 from club.models import Club
 from user.decorators import role_required
+from user.idempotency import idempotent
 
 
 @login_required
 @role_required('parent')
+@idempotent
 def create_child(request):
     """
     Create a new child record for the logged-in parent.
@@ -134,7 +141,51 @@ def delete_child(request, child_id):
 @role_required('parent')
 def view_all_clubs(request):
     """
-    Display a list of all clubs and events to parents.
+    Display the club and event catalogue to parents, one page at a time.
+    Filters come from the query string. Browsing pages with the `after`
+    cursor, while a search ranks its matches and pages with `page`.
     """
-    clubs = Club.objects.all().order_by('start_date', 'start_time')
-    return render(request, "child/view_all_clubs.html", {"clubs": clubs})
+    filter_form = ClubFilterForm(request.GET)
+    clubs = filter_form.filter(Club.objects.select_related('teacher'))
+
+    # Carry the current filters over to the next and first page links
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('page', None)
+    first_page_query = query.urlencode()
+    next_page_query = None
+
+    search_text = filter_form.search_text
+    if search_text:
+        try:
+            page = max(int(request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+        clubs, has_next = search_clubs(clubs, search_text, page)
+        if has_next:
+            query['page'] = page + 1
+            next_page_query = query.urlencode()
+    else:
+        clubs, next_cursor = catalogue_page(
+            clubs, cursor=request.GET.get('after')
+        )
+        if next_cursor:
+            query['after'] = next_cursor
+            next_page_query = query.urlencode()
+
+    attach_card_html(clubs)
+
+    # Badge each club with whether each of the parent's children can join
+    children = list(request.user.children.order_by('first_name'))
+    matrix = eligibility_matrix(children, clubs)
+    for club in clubs:
+        club.eligibility = [matrix[child.pk, club.pk] for child in children]
+
+    return render(request, "child/view_all_clubs.html", {
+        "clubs": clubs,
+        "filter_form": filter_form,
+        "is_first_page": not ({'after', 'page'} & request.GET.keys()),
+        "first_page_query": first_page_query,
+        "next_page_query": next_page_query,
+        "live_seats": settings.ASGI_DEPLOYMENT,
+    })
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+
+from enrollment.models import Enrollment
+from school_clubs_events.caching import cache_timeout
+
+ACCESS_KEY = 'teacher_children:{}'
+# Kept short as a backstop: a stale index could show a child's details
+# after their enrollment ended, should an invalidation be missed
+ACCESS_TIMEOUT = 60 * 5
+
+
+def access_key(teacher_id):
+    return ACCESS_KEY.format(teacher_id)
+
+
+def visible_children(teacher):
+    """
+    Return the ids of the children a teacher may see, those actively
+    enrolled in one of their clubs. The set is cached per teacher and
+    dropped whenever the teacher's clubs or enrollments change, so
+    permission checks for a whole roster need no database round trip.
+    """
+    key = access_key(teacher.pk)
+    children = cache.get(key)
+    if children is None:
+        children = frozenset(
+            Enrollment.objects
+            .active()
+            .filter(club__teacher=teacher)
+            .values_list('child_id', flat=True)
+        )
+        cache.set(key, children, timeout=cache_timeout(ACCESS_TIMEOUT))
+    return children
+
+
+def can_view_child(teacher, child_id):
+    return child_id in visible_children(teacher)
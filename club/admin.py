@@ -1,5 +1,18 @@
 from django.contrib import admin
-from .models import Club
+from enrollment.services import promote_waitlist
+from .models import Club, ClubSession
+from .services import sync_sessions
+
+
+class ClubSessionInline(admin.TabularInline):
+    model = ClubSession
+    fields = ('date', 'start_time', 'end_time')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Club)
@@ -10,12 +23,21 @@ class ClubAdmin(admin.ModelAdmin):
         'min_age',
         'max_age',
         'capacity',
+        'seats_remaining',
         'start_time',
         'end_time',
     )
     search_fields = ('name',)
+    readonly_fields = ('active_enrollment_count', 'seats_remaining')
     list_filter = (
         'club_or_event',
         'min_age',
         'max_age',
     )
+    inlines = [ClubSessionInline]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        sync_sessions(obj)
+        # A capacity increase may free seats for waitlisted children
+        promote_waitlist(obj)
@@ -0,0 +1,173 @@
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from enrollment.models import Enrollment
+from .models import Club, ClubSession
+
+FEED_SALT = 'club.calendar.{}'
+FEED_ROLES = ('parent', 'teacher')
+# RFC 5545 lines are folded at 75 octets
+LINE_LIMIT = 75
+
+
+def feed_token(user):
+    """
+    Signed token identifying a user's calendar feed.
+    Calendar apps cannot log in, so the token stands in for a session.
+    It carries the user's feed key, so resetting the key revokes it.
+    """
+    return signing.Signer(salt=FEED_SALT.format(user.role)).sign(
+        f"{user.pk}:{user.feed_key}"
+    )
+
+
+def user_for_token(token, role):
+    """
+    Return the user a feed token was issued to, or None if the token is
+    invalid, has been revoked or the user no longer has the role.
+    """
+    try:
+        value = signing.Signer(salt=FEED_SALT.format(role)).unsign(token)
+    except signing.BadSignature:
+        return None
+    pk, _, key = value.partition(':')
+    if not key:
+        return None
+    return get_user_model().objects.filter(
+        pk=pk, role=role, feed_key=key
+    ).first()
+
+
+def feed_version(user):
+    """
+    Return an (etag, last_modified) pair for a user's feed from a single
+    aggregate query, so an unchanged feed is answered without building it.
+    The row count catches deletions that leave the newest timestamp alone.
+    """
+    if user.role == 'teacher':
+        stats = Club.objects.filter(teacher=user).aggregate(
+            club=Max('updated_at'), rows=Count('pk')
+        )
+    else:
+        stats = Enrollment.objects.filter(child__parent=user).aggregate(
+            enrollment=Max('updated_at'),
+            club=Max('club__updated_at'),
+            child=Max('child__updated_at'),
+            rows=Count('pk'),
+        )
+
+    rows = stats.pop('rows')
+    stamps = [stamp for stamp in stats.values() if stamp is not None]
+    last_modified = max(stamps) if stamps else None
+    stamp = last_modified.isoformat() if last_modified else ''
+    etag = hashlib.sha1(
+        f'{user.role}:{user.pk}:{rows}:{stamp}'.encode()
+    ).hexdigest()
+    return f'"{etag}"', last_modified
+
+
+def feed_sessions(user):
+    """
+    Sessions in a user's feed: every session of a teacher's clubs, or for
+    a parent one row per session per child actively enrolled in the club.
+    """
+    sessions = ClubSession.objects.select_related('club')
+    if user.role == 'teacher':
+        sessions = sessions.filter(club__teacher=user)
+    else:
+        sessions = sessions.filter(
+            club__enrollments__child__parent=user,
+            club__enrollments__status='active'
+        ).annotate(
+            child_id=F('club__enrollments__child'),
+            child_name=F('club__enrollments__child__first_name'),
+        )
+    return sessions.order_by('date', 'start_time')
+
+
+def escape_text(value):
+    """
+    Escape a value for an iCalendar TEXT property.
+    """
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """
+    Fold a content line into chunks of at most 75 octets, each
+    continuation starting with a space, and end it with CRLF.
+    """
+    chunks = []
+    chunk, size = '', 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > LINE_LIMIT:
+            chunks.append(chunk)
+            # The leading space counts towards the next line's octets
+            chunk, size = ' ', 1
+        chunk += char
+        size += width
+    chunks.append(chunk)
+    return '\r\n'.join(chunks) + '\r\n'
+
+
+def utc_stamp(day, moment):
+    """
+    Format a session date and time, local to TIME_ZONE, as an iCalendar
+    UTC date-time. A TZID would need a VTIMEZONE with the zone's rules
+    (RFC 5545 3.2.19), which strict clients insist on; UTC needs none.
+    """
+    local = datetime.combine(
+        day, moment, tzinfo=timezone.get_default_timezone()
+    )
+    return local.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ical_lines(sessions, host, calendar_name):
+    """
+    Yield the feed one folded line at a time, so the response can be
+    streamed while the sessions are read from the database in chunks.
+    """
+    yield fold('BEGIN:VCALENDAR')
+    yield fold('VERSION:2.0')
+    yield fold('PRODID:-//School Clubs & Events//Calendar Feed//EN')
+    yield fold('CALSCALE:GREGORIAN')
+    yield fold(f'X-WR-CALNAME:{escape_text(calendar_name)}')
+    # Clients show the UTC times below in this zone
+    yield fold(f'X-WR-TIMEZONE:{settings.TIME_ZONE}')
+
+    for session in sessions.iterator(chunk_size=500):
+        club = session.club
+        child_id = getattr(session, 'child_id', None)
+        summary = club.name
+        uid = f'session-{session.pk}'
+        if child_id is not None:
+            summary = f'{session.child_name}: {club.name}'
+            uid = f'{uid}-child-{child_id}'
+        stamp = club.updated_at.astimezone(dt_timezone.utc)
+
+        yield fold('BEGIN:VEVENT')
+        yield fold(f'UID:{uid}@{host}')
+        yield fold(f'DTSTAMP:{stamp:%Y%m%dT%H%M%SZ}')
+        yield fold(
+            f'DTSTART:{utc_stamp(session.date, session.start_time)}'
+        )
+        yield fold(f'DTEND:{utc_stamp(session.date, session.end_time)}')
+        yield fold(f'SUMMARY:{escape_text(summary)}')
+        if club.description:
+            yield fold(f'DESCRIPTION:{escape_text(club.description)}')
+        yield fold('END:VEVENT')
+
+    yield fold('END:VCALENDAR')
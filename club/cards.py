@@ -0,0 +1,45 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+CARD_KEY = 'club_card:{}'
+CARD_TEMPLATE = 'club/club_card.html'
+CARD_TIMEOUT = 60 * 60 * 24
+
+
+def card_key(club_id):
+    return CARD_KEY.format(club_id)
+
+
+def card_version(club):
+    """
+    The card only changes when the club or its teacher is saved.
+    """
+    return (club.updated_at.isoformat(), club.teacher.updated_at.isoformat())
+
+
+def attach_card_html(clubs):
+    """
+    Set `card_html` on each club to its rendered catalogue card, reusing
+    cached fragments whose version still matches. The whole page is read
+    with one get_many and new fragments written with one set_many, which
+    keeps the round trips low on the file-based cache as well.
+    Seats and eligibility change without a save, so they stay outside.
+    """
+    keys = {club.pk: card_key(club.pk) for club in clubs}
+    cached = cache.get_many(keys.values())
+    fresh = {}
+
+    for club in clubs:
+        version = card_version(club)
+        entry = cached.get(keys[club.pk])
+        if entry is not None and entry[0] == version:
+            html = entry[1]
+        else:
+            html = render_to_string(CARD_TEMPLATE, {'club': club})
+            fresh[keys[club.pk]] = (version, html)
+        club.card_html = mark_safe(html)
+
+    if fresh:
+        cache.set_many(fresh, timeout=CARD_TIMEOUT)
+    return clubs
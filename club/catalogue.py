@@ -0,0 +1,86 @@
+from datetime import date, time
+
+from django.core import signing
+from django.db.models import F, Q
+
+CURSOR_SALT = 'club.catalogue'
+PAGE_SIZE = 24
+
+# Clubs without a start date sort after every dated club
+CATALOGUE_ORDER = (
+    F('start_date').asc(nulls_last=True),
+    'start_time',
+    'id',
+)
+
+
+def encode_cursor(club):
+    """
+    Turn the sort key of the last club on a page into an opaque cursor.
+    """
+    return signing.dumps(
+        [
+            club.start_date.isoformat() if club.start_date else None,
+            club.start_time.isoformat(),
+            club.pk,
+        ],
+        salt=CURSOR_SALT,
+    )
+
+
+def decode_cursor(cursor):
+    """
+    Return the (start_date, start_time, id) key held in a cursor,
+    or None if the cursor is missing or has been tampered with.
+    """
+    if not cursor:
+        return None
+    try:
+        start_date, start_time, pk = signing.loads(cursor, salt=CURSOR_SALT)
+        return (
+            date.fromisoformat(start_date) if start_date else None,
+            time.fromisoformat(start_time),
+            int(pk),
+        )
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def seek_after(key):
+    """
+    Condition selecting the clubs that sort after the given key.
+    """
+    start_date, start_time, pk = key
+    later_same_day = (
+        Q(start_time__gt=start_time)
+        | Q(start_time=start_time, id__gt=pk)
+    )
+    if start_date is None:
+        return Q(start_date__isnull=True) & later_same_day
+    return (
+        Q(start_date__gt=start_date)
+        | (Q(start_date=start_date) & later_same_day)
+        | Q(start_date__isnull=True)
+    )
+
+
+def catalogue_page(queryset, cursor=None, page_size=None):
+    """
+    Fetch one page of clubs with keyset pagination: the page starts
+    straight after the cursor's sort key instead of skipping rows with
+    OFFSET, so every page costs the same however deep it is.
+    Returns the clubs and the cursor for the next page (or None).
+    """
+    page_size = page_size or PAGE_SIZE
+    queryset = queryset.order_by(*CATALOGUE_ORDER)
+    key = decode_cursor(cursor)
+    if key is not None:
+        queryset = queryset.filter(seek_after(key))
+
+    # One extra row tells us whether another page follows
+    clubs = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(clubs) > page_size:
+        clubs = clubs[:page_size]
+        next_cursor = encode_cursor(clubs[-1])
+    return clubs, next_cursor
@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from enrollment.models import Enrollment
+from school_clubs_events.caching import cache_timeout
+from .access import access_key
+from .models import Club, ClubSession
+
+STATS_KEY = 'teacher_stats:{}'
+# A backstop only; changes to clubs and enrollments drop the entry
+STATS_TIMEOUT = 60 * 15
+UPCOMING_DAYS = 7
+UPCOMING_LIMIT = 10
+RECENT_CANCELLATION_DAYS = 7
+# Share of places taken at which a club counts as nearly full
+NEAR_CAPACITY = 0.9
+
+
+def stats_key(teacher_id):
+    return STATS_KEY.format(teacher_id)
+
+
+def teacher_cache_keys(teacher_ids):
+    """
+    Keys of everything cached per teacher that follows their clubs and
+    enrollments: the dashboard figures and the child access index.
+    """
+    return [
+        key
+        for pk in set(teacher_ids)
+        for key in (stats_key(pk), access_key(pk))
+    ]
+
+
+def drop_teacher_caches(*teacher_ids):
+    """
+    Forget what is cached for some teachers once the current transaction
+    commits, so the next request recomputes it.
+    """
+    transaction.on_commit(
+        partial(cache.delete_many, teacher_cache_keys(teacher_ids))
+    )
+
+
+def drop_club_teacher_caches(*club_ids):
+    """
+    Forget what is cached for the teachers running some clubs, for
+    enrollment changes, which only know the club.
+    """
+    transaction.on_commit(partial(_drop_for_clubs, club_ids))
+
+
+def _drop_for_clubs(club_ids):
+    teacher_ids = Club.objects.filter(pk__in=club_ids).values_list(
+        'teacher_id', flat=True
+    )
+    cache.delete_many(teacher_cache_keys(teacher_ids))
+
+
+def compute_teacher_stats(teacher):
+    """
+    Build a teacher's dashboard figures. Fill rates come from the live
+    seat counters on each club; unique children and recent cancellations
+    from one aggregate over the teacher's enrollments; and the upcoming
+    sessions from one range scan of the session table.
+    """
+    today = date.today()
+    clubs = list(
+        Club.objects
+        .filter(teacher=teacher)
+        .order_by('start_date', 'start_time', 'id')
+        .values('pk', 'name', 'capacity', 'active_enrollment_count')
+    )
+    for club in clubs:
+        club['fill_rate'] = (
+            round(club['active_enrollment_count'] * 100 / club['capacity'])
+            if club['capacity'] else 0
+        )
+        club['near_capacity'] = (
+            club['capacity'] > 0
+            and club['active_enrollment_count']
+            >= club['capacity'] * NEAR_CAPACITY
+        )
+
+    since = timezone.now() - timedelta(days=RECENT_CANCELLATION_DAYS)
+    totals = Enrollment.objects.filter(club__teacher=teacher).aggregate(
+        children=Count('child', distinct=True, filter=Q(status='active')),
+        cancellations=Count(
+            'pk', filter=Q(status='cancelled', updated_at__gte=since)
+        ),
+    )
+
+    upcoming = list(
+        ClubSession.objects
+        .filter(club__teacher=teacher)
+        .between(today, today + timedelta(days=UPCOMING_DAYS - 1))
+        .values('date', 'start_time', 'end_time', 'club_id', 'club__name')
+        [:UPCOMING_LIMIT]
+    )
+
+    return {
+        'clubs': clubs,
+        'places': sum(club['capacity'] for club in clubs),
+        'enrolled': sum(club['active_enrollment_count'] for club in clubs),
+        'children': totals['children'],
+        'near_capacity': [club for club in clubs if club['near_capacity']],
+        'recent_cancellations': totals['cancellations'],
+        'upcoming': upcoming,
+    }
+
+
+def teacher_stats(teacher):
+    """
+    Return a teacher's dashboard figures from the cache, computing and
+    storing them on a miss.
+    """
+    key = stats_key(teacher.pk)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_teacher_stats(teacher)
+        cache.set(key, stats, timeout=cache_timeout(STATS_TIMEOUT))
+    return stats
@@ -0,0 +1,188 @@
+import csv
+import re
+import zipfile
+from datetime import date
+from xml.sax.saxutils import escape
+
+from enrollment.models import Enrollment
+
+# Rows fetched per round trip; a server-side cursor on Postgres
+CHUNK_SIZE = 2000
+
+ROSTER_COLUMNS = (
+    ('club__name', 'Club'),
+    ('child__first_name', 'First name'),
+    ('child__surname', 'Surname'),
+    ('child__date_of_birth', 'Date of birth'),
+    ('child__allergy_info', 'Allergy info'),
+    ('child__emergency_contact_name', 'Emergency contact name'),
+    ('child__emergency_contact_phone', 'Emergency contact phone'),
+    ('child__special_needs', 'Special needs'),
+)
+
+# Characters XML 1.0 does not allow, even escaped
+ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def roster_rows(teacher, club=None):
+    """
+    Yield one tuple per child actively enrolled in the teacher's clubs
+    (or just `club`), read in chunks so memory use stays flat.
+    """
+    enrollments = Enrollment.objects.active().filter(club__teacher=teacher)
+    if club is not None:
+        enrollments = enrollments.filter(club=club)
+    return (
+        enrollments
+        .order_by('club__name', 'child__surname', 'child__first_name', 'id')
+        .values_list(*(field for field, _ in ROSTER_COLUMNS))
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_safe(text):
+    """
+    Stop spreadsheet apps running text typed by parents as a formula.
+    Phone numbers such as +44 7700 900123 are left alone.
+    """
+    if text[:1] in ('=', '@', '\t', '\r') or (
+        text[:1] in ('+', '-')
+        and not text[1:].replace(' ', '').isdigit()
+    ):
+        return "'" + text
+    return text
+
+
+class Echo:
+    """
+    File-like object that hands back what is written to it, so a
+    csv.writer can produce one line at a time for streaming.
+    """
+    def write(self, value):
+        return value
+
+
+def roster_csv(rows):
+    """
+    Yield the roster as CSV, one encoded line per row.
+    """
+    writer = csv.writer(Echo())
+    # Byte order mark so Excel opens the file as UTF-8
+    yield '\ufeff'.encode()
+    yield writer.writerow([label for _, label in ROSTER_COLUMNS]).encode()
+    for row in rows:
+        yield writer.writerow(
+            [csv_safe(cell_text(value)) for value in row]
+        ).encode()
+
+
+class Pipe:
+    """
+    Write-only stream that collects what zipfile writes until it is
+    drained, so the archive can be streamed as it is built.
+    """
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType='
+        '"application/vnd.openxmlformats-officedocument.spreadsheetml.'
+        'worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/'
+        'spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.'
+        'org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Roster" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def xlsx_row(values):
+    cells = ''.join(
+        '<c t="inlineStr"><is><t xml:space="preserve">'
+        f'{escape(ILLEGAL_XML.sub("", text))}</t></is></c>'
+        for text in values
+    )
+    return f'<row>{cells}</row>'.encode()
+
+
+def roster_xlsx(rows):
+    """
+    Yield the roster as an .xlsx workbook, streamed while it is zipped.
+    Cells are inline strings, so no shared-string table has to be built
+    in memory first.
+    """
+    pipe = Pipe()
+    with zipfile.ZipFile(pipe, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        yield pipe.drain()
+
+        with workbook.open(
+            'xl/worksheets/sheet1.xml', 'w', force_zip64=True
+        ) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/'
+                b'spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(xlsx_row(label for _, label in ROSTER_COLUMNS))
+            for row in rows:
+                sheet.write(xlsx_row(cell_text(value) for value in row))
+                data = pipe.drain()
+                if data:
+                    yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield pipe.drain()
@@ -36,7 +36,6 @@ class ClubForm(forms.ModelForm):
         """
         cleaned_data = super().clean()
         # Extracted fields
-        name = cleaned_data.get('name')
         frequency = cleaned_data.get('frequency')
         start_date = cleaned_data.get('start_date')
         end_date = cleaned_data.get('end_date')
@@ -51,14 +50,8 @@ class ClubForm(forms.ModelForm):
             if cleaned_data.get(field_name) in [None, '']:
                 self.add_error(field_name, 'This field is required.')
 
-        # Check club name uniqueness
-        if name:
-            existing_clubs = Club.objects.filter(name__iexact=name)
-            if self.instance.pk:
-                existing_clubs = existing_clubs.exclude(pk=self.instance.pk)
-
-            if existing_clubs.exists():
-                self.add_error('name', 'A club with this name already exists.')
+        # Club name uniqueness is checked by the model's case-insensitive
+        # unique constraint when the form validates the instance
 
         # Age range validation
         if min_age is not None and max_age is not None:
@@ -103,3 +96,91 @@ class ClubForm(forms.ModelForm):
                     'Capacity must be a positive number.')
 
         return cleaned_data
+
+
+class ClubImportForm(forms.Form):
+    """
+    Upload form for a CSV file of clubs to create in one go.
+    """
+    file = forms.FileField(
+        label='CSV file',
+        help_text='One club per row, with a header row naming the columns.'
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith('.csv'):
+            raise forms.ValidationError('Please upload a .csv file.')
+        return upload
+
+
+class RegisterForm(forms.Form):
+    """
+    Attendance register for one session: a tick for each enrolled child
+    who turned up.
+    """
+    present = forms.TypedMultipleChoiceField(
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+    )
+
+    def __init__(self, enrollments, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['present'].choices = [
+            (enrollment.pk,
+             f"{enrollment.child.first_name} {enrollment.child.surname}")
+            for enrollment in enrollments
+        ]
+
+
+class RolloverForm(forms.Form):
+    """
+    Choose which of a teacher's clubs to copy into the next term.
+    """
+    clubs = forms.ModelMultipleChoiceField(
+        queryset=Club.objects.none(),
+        widget=forms.CheckboxSelectMultiple,
+    )
+    source_start = forms.DateField(
+        label='Current term start',
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        help_text='One-off events move by the gap between the two starts.'
+    )
+    term_start = forms.DateField(
+        label='New term start',
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    term_end = forms.DateField(
+        label='New term end',
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    suffix = forms.CharField(
+        max_length=40,
+        help_text='Added to each name, e.g. "Spring 2027".'
+    )
+    carry_enrollments = forms.BooleanField(
+        required=False,
+        label='Carry over enrolled children',
+    )
+
+    def __init__(self, teacher, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['clubs'].queryset = Club.objects.filter(
+            teacher=teacher
+        ).order_by('name')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        term_start = cleaned_data.get('term_start')
+        term_end = cleaned_data.get('term_end')
+        source_start = cleaned_data.get('source_start')
+        if term_start and term_end and term_start > term_end:
+            self.add_error(
+                'term_end',
+                'End date must be after or equal to start date.')
+        if source_start and term_start and source_start >= term_start:
+            self.add_error(
+                'term_start',
+                'The new term must start after the current one.')
+        return cleaned_data
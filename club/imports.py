@@ -0,0 +1,144 @@
+import csv
+import string
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models.functions import Lower
+
+from .dashboard import drop_teacher_caches
+from .forms import ClubForm
+from .models import NAME_TAKEN, Club
+from .services import create_sessions
+
+IMPORT_COLUMNS = tuple(ClubForm.Meta.fields)
+MAX_IMPORT_ROWS = 5000
+# SQLite's lower() only folds ASCII letters
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def name_key(name):
+    """
+    Lower a club name the way the database does for the case-insensitive
+    unique constraint, so names checked up front match what it rejects.
+    """
+    if connection.vendor == 'sqlite':
+        return name.translate(ASCII_LOWER)
+    return name.lower()
+
+
+class ClubRowForm(ClubForm):
+    """
+    ClubForm for one row of an import. Names are checked against the
+    database for the whole file at once, not one query per row.
+    """
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.add('name')
+        return exclude
+
+
+class ClubImport:
+    """
+    Result of importing a CSV of clubs.
+    Each problem adds a (line, message) pair to `errors`; nothing is
+    saved unless every row is valid.
+    """
+    def __init__(self):
+        self.clubs = []
+        self.errors = []
+
+    def add(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+
+def read_rows(source, result):
+    """
+    Return the (line, row) pairs of a CSV file whose header names the
+    ClubForm fields, recording any problem with the file itself.
+    """
+    reader = csv.DictReader(source)
+    header = [column.strip() for column in reader.fieldnames or []]
+    missing = [column for column in IMPORT_COLUMNS if column not in header]
+    if missing:
+        result.add(1, f"Missing column(s): {', '.join(missing)}.")
+        return []
+    reader.fieldnames = header
+
+    rows = []
+    for row in reader:
+        if len(rows) == MAX_IMPORT_ROWS:
+            result.add(
+                reader.line_num,
+                f"Files are limited to {MAX_IMPORT_ROWS} clubs."
+            )
+            return []
+        # Blank trailing lines are common in spreadsheet exports
+        if any((value or '').strip() for value in row.values()):
+            rows.append((reader.line_num, row))
+    return rows
+
+
+def import_clubs(teacher, source, dry_run=False):
+    """
+    Validate every row of a CSV of clubs with the ClubForm rules and,
+    if all are valid, create the clubs and their sessions in bulk in one
+    transaction. Returns a ClubImport holding the clubs or the errors.
+    """
+    result = ClubImport()
+    rows = read_rows(source, result)
+
+    names = {}
+    valid = []
+    for line, row in rows:
+        form = ClubRowForm(row)
+        if not form.is_valid():
+            for field, messages in form.errors.items():
+                label = field if field != '__all__' else 'row'
+                for message in messages:
+                    result.add(line, f"{label}: {message}")
+            continue
+
+        club = form.save(commit=False)
+        club.teacher = teacher
+        # bulk_create skips Club.save, which fills the seat counter
+        club.seats_remaining = club.capacity
+        key = name_key(club.name)
+        if key in names:
+            result.add(
+                line, f"name: Repeats the club on line {names[key]}."
+            )
+            continue
+        names[key] = line
+        valid.append((line, club))
+
+    # One query for every name in the file
+    taken = set(
+        Club.objects
+        .annotate(lower_name=Lower('name'))
+        .filter(lower_name__in=list(names))
+        .values_list('lower_name', flat=True)
+    ) if names else set()
+    for line, club in valid:
+        if name_key(club.name) in taken:
+            result.add(line, f"name: {NAME_TAKEN}")
+
+    result.errors.sort(key=lambda error: error[0])
+    if not result.is_valid:
+        return result
+    result.clubs = [club for _, club in valid]
+    if dry_run:
+        return result
+
+    try:
+        with transaction.atomic():
+            Club.objects.bulk_create(result.clubs, batch_size=500)
+            create_sessions(result.clubs)
+            drop_teacher_caches(teacher.pk)
+    except IntegrityError:
+        # Another teacher took one of the names after the check above
+        result.clubs = []
+        result.add(0, f"name: {NAME_TAKEN} Please check and try again.")
+    return result
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from club.imports import import_clubs
+
+
+class Command(BaseCommand):
+    """
+    Create clubs in bulk for a teacher from a CSV file whose header row
+    names the ClubForm fields. Nothing is saved if any row is invalid.
+    """
+    help = 'Import clubs for a teacher from a CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file of clubs to import.')
+        parser.add_argument(
+            '--teacher', required=True,
+            help='Email address of the teacher who will run the clubs.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Check the file without saving anything.'
+        )
+
+    def handle(self, *args, **options):
+        teacher = get_user_model().objects.filter(
+            email__iexact=options['teacher'], role='teacher'
+        ).first()
+        if teacher is None:
+            raise CommandError(f"No teacher with email {options['teacher']}.")
+
+        try:
+            with open(
+                options['path'], encoding='utf-8-sig', newline=''
+            ) as source:
+                result = import_clubs(
+                    teacher, source, dry_run=options['dry_run']
+                )
+        except OSError as error:
+            raise CommandError(f"Cannot read {options['path']}: {error}")
+
+        if not result.is_valid:
+            for line, message in result.errors:
+                self.stderr.write(f'Line {line}: {message}')
+            raise CommandError(
+                f'{len(result.errors)} problem(s) found; no clubs imported.'
+            )
+
+        verb = 'Checked' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(result.clubs)} club(s).'
+        ))
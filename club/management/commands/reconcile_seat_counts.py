@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from club.models import Club
+from club.seats import notify_seat_change
+from enrollment.models import Enrollment
+
+
+class Command(BaseCommand):
+    """
+    Recount active enrollments and repair any drift in the live
+    seat counters stored on each club.
+    """
+    help = 'Reconcile Club seat counters with the enrollment table.'
+
+    def handle(self, *args, **options):
+        active = Coalesce(
+            Subquery(
+                Enrollment.objects
+                .active()
+                .filter(club=OuterRef('pk'))
+                .values('club')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0
+        )
+        seats = Greatest(F('capacity') - active, 0)
+
+        drifted = list(
+            Club.objects
+            .annotate(active=active, seats=seats)
+            .filter(
+                ~Q(active_enrollment_count=F('active'))
+                | ~Q(seats_remaining=F('seats'))
+            )
+            .values_list('pk', flat=True)
+        )
+
+        # Recount inside the UPDATE itself so concurrent enrollments
+        # between the check above and the repair are not lost
+        Club.objects.filter(pk__in=drifted).update(
+            active_enrollment_count=active,
+            seats_remaining=seats,
+        )
+        notify_seat_change(*drifted)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled seat counters for {len(drifted)} club(s).'
+        ))
@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from club.models import Club
+from club.rollover import clone_clubs
+
+
+class Command(BaseCommand):
+    """
+    Copy the clubs of the current term into a new term in one
+    transaction: every club in the school, or only one teacher's.
+    Nothing is saved if any copy fails. The current term runs from
+    --from to --to; by default it is as long as the new term and ends
+    the day before it starts.
+    """
+    help = 'Copy clubs into a new term.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start', required=True, type=date.fromisoformat,
+            help='First day of the new term (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--end', required=True, type=date.fromisoformat,
+            help='Last day of the new term (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--from', dest='source_start', type=date.fromisoformat,
+            help='First day of the current term (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--to', dest='source_end', type=date.fromisoformat,
+            help='Last day of the current term (YYYY-MM-DD).'
+        )
+        parser.add_argument(
+            '--suffix', required=True,
+            help='Added to each club name, e.g. "Spring 2027".'
+        )
+        parser.add_argument(
+            '--teacher',
+            help='Only copy the clubs of the teacher with this email.'
+        )
+        parser.add_argument(
+            '--carry-enrollments', action='store_true',
+            help='Enroll the children of each club in its copy.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Check the copies without saving anything.'
+        )
+
+    def handle(self, *args, **options):
+        term_start, term_end = options['start'], options['end']
+        if term_start > term_end:
+            raise CommandError('The term must end on or after its start.')
+        source_end = options['source_end'] or term_start - timedelta(days=1)
+        source_start = options['source_start'] or (
+            source_end - (term_end - term_start)
+        )
+        if source_start > source_end or source_end >= term_start:
+            raise CommandError(
+                'The current term must end before the new one starts.'
+            )
+
+        # Only clubs running in the current term, so clubs of earlier
+        # terms and their copies are not copied again
+        clubs = Club.objects.filter(
+            start_date__lte=source_end, end_date__gte=source_start
+        )
+        if options['teacher']:
+            teacher = get_user_model().objects.filter(
+                email__iexact=options['teacher'], role='teacher'
+            ).first()
+            if teacher is None:
+                raise CommandError(
+                    f"No teacher with email {options['teacher']}."
+                )
+            clubs = clubs.filter(teacher=teacher)
+
+        result = clone_clubs(
+            clubs,
+            source_start,
+            term_start,
+            term_end,
+            options['suffix'],
+            carry_enrollments=options['carry_enrollments'],
+            dry_run=options['dry_run'],
+        )
+        if not result.is_valid:
+            for name, message in result.errors:
+                self.stderr.write(f'{name or "All clubs"}: {message}')
+            raise CommandError(
+                f'{len(result.errors)} problem(s) found; no clubs copied.'
+            )
+
+        for name, message in result.skipped:
+            self.stdout.write(self.style.WARNING(f'{name}: {message}'))
+        verb = 'Checked' if options['dry_run'] else 'Copied'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(result.clubs)} club(s) with '
+            f'{len(result.enrollments)} enrollment(s).'
+        ))
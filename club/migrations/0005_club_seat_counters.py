@@ -0,0 +1,41 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:46
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_seat_counters(apps, schema_editor):
+    Club = apps.get_model('club', 'Club')
+    clubs = list(Club.objects.annotate(
+        active=Count('enrollments', filter=Q(enrollments__status='active'))
+    ))
+    for club in clubs:
+        club.active_enrollment_count = club.active
+        club.seats_remaining = max(club.capacity - club.active, 0)
+    Club.objects.bulk_update(
+        clubs, ['active_enrollment_count', 'seats_remaining'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0004_club_club_or_event'),
+        ('enrollment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='active_enrollment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='seats_remaining',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            backfill_seat_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0005_club_seat_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['start_date', 'start_time', 'id'], name='club_catalogue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['club_or_event', 'start_date', 'start_time', 'id'], name='club_kind_catalogue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['frequency', 'start_date', 'start_time', 'id'], name='club_freq_catalogue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['min_age', 'max_age'], name='club_age_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='club',
+            index=models.Index(fields=['end_date', 'start_date'], name='club_date_window_idx'),
+        ),
+    ]
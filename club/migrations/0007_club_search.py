@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from club.search import SQLITE_CREATE, SQLITE_DROP, search_index
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_DROP + SQLITE_CREATE:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('club', 'Club'), search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_DROP:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(
+            apps.get_model('club', 'Club'), search_index()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0006_club_catalogue_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from club.services import sync_sessions
+
+
+def generate_sessions(apps, schema_editor):
+    Club = apps.get_model('club', 'Club')
+    for club in Club.objects.iterator():
+        sync_sessions(club)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0007_club_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='club.club')),
+            ],
+            options={
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['date', 'start_time'], name='clubsession_date_time_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='clubsession',
+            constraint=models.UniqueConstraint(fields=('club', 'date'), name='unique_club_session_date'),
+        ),
+        migrations.RunPython(generate_sessions, migrations.RunPython.noop),
+    ]
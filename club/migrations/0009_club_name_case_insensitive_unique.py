@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:22
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+def rename_duplicate_names(apps, schema_editor):
+    # Older clubs keep their name; later case-insensitive duplicates get
+    # their id appended so the unique constraint can be added
+    Club = apps.get_model('club', 'Club')
+    seen = set()
+    for club in Club.objects.order_by('pk').only('pk', 'name'):
+        key = club.name.lower()
+        if key in seen:
+            Club.objects.filter(pk=club.pk).update(
+                name=f'{club.name} ({club.pk})'
+            )
+        seen.add(key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0008_clubsession'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            rename_duplicate_names, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='club',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='unique_club_name_ci', violation_error_message='A club with this name already exists.'),
+        ),
+    ]
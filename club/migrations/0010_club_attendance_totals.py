@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+from club.search import restore_sqlite_search
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0009_club_name_case_insensitive_unique'),
+    ]
+
+    # Adding the columns rebuilds club_club on SQLite, which drops the
+    # search triggers, so they are put back in both directions
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_search),
+        migrations.AddField(
+            model_name='club',
+            name='attendance_marked',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='attendance_present',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_sqlite_search, migrations.RunPython.noop),
+    ]
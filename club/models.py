@@ -1,7 +1,57 @@
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Greatest, Lower
 from django.conf import settings
 from django.utils import timezone
 
+from .seats import notify_seat_change
+
+NAME_TAKEN = 'A club with this name already exists.'
+
+
+class ClubQuerySet(models.QuerySet):
+    """
+    QuerySet with helpers for keeping the live seat counters in sync.
+    """
+    def adjust_enrollment_count(self, delta):
+        """
+        Add delta to the active enrollment counter of the selected clubs
+        and recompute their remaining seats in the same UPDATE.
+        """
+        return self.update(
+            active_enrollment_count=Greatest(
+                F('active_enrollment_count') + delta, 0
+            ),
+            seats_remaining=Greatest(
+                F('capacity') - F('active_enrollment_count') - delta, 0
+            ),
+        )
+
+    def suitable_for_age(self, age):
+        """
+        Clubs whose age limits, where set, include the given age.
+        """
+        return self.filter(
+            Q(min_age__isnull=True) | Q(min_age__lte=age),
+            Q(max_age__isnull=True) | Q(max_age__gte=age),
+        )
+
+    def running_between(self, date_from=None, date_to=None):
+        """
+        Clubs with at least one day inside the given date window.
+        A club without an end date runs on its start date only.
+        """
+        queryset = self
+        if date_to is not None:
+            queryset = queryset.filter(start_date__lte=date_to)
+        if date_from is not None:
+            queryset = queryset.filter(
+                Q(end_date__gte=date_from)
+                | Q(end_date__isnull=True, start_date__gte=date_from)
+            )
+        return queryset
+
 
 class Club(models.Model):
     FREQUENCY_CHOICES = [
@@ -35,9 +85,110 @@ class Club(models.Model):
     frequency = models.CharField(max_length=20,
                                  choices=FREQUENCY_CHOICES,
                                  default='one-off')
+    # Live seat counters, maintained by enrollment signals
+    active_enrollment_count = models.PositiveIntegerField(default=0)
+    seats_remaining = models.PositiveIntegerField(default=0)
+    # Attendance totals over every register taken for the club
+    attendance_marked = models.PositiveIntegerField(default=0)
+    attendance_present = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ClubQuerySet.as_manager()
+
+    COUNTER_FIELDS = (
+        'active_enrollment_count',
+        'seats_remaining',
+        'attendance_marked',
+        'attendance_present',
+    )
+
+    class Meta:
+        constraints = [
+            # Backed by a unique index on LOWER(name), so the duplicate
+            # check is one index probe and concurrent creates cannot race
+            models.UniqueConstraint(
+                Lower('name'),
+                name='unique_club_name_ci',
+                violation_error_message=NAME_TAKEN,
+            ),
+        ]
+        # Each catalogue filter leads an index that ends in the
+        # catalogue's (start_date, start_time, id) keyset order
+        indexes = [
+            models.Index(
+                fields=['start_date', 'start_time', 'id'],
+                name='club_catalogue_idx'
+            ),
+            models.Index(
+                fields=['club_or_event', 'start_date', 'start_time', 'id'],
+                name='club_kind_catalogue_idx'
+            ),
+            models.Index(
+                fields=['frequency', 'start_date', 'start_time', 'id'],
+                name='club_freq_catalogue_idx'
+            ),
+            models.Index(
+                fields=['min_age', 'max_age'],
+                name='club_age_range_idx'
+            ),
+            models.Index(
+                fields=['end_date', 'start_date'],
+                name='club_date_window_idx'
+            ),
+        ]
+
+    def validate_constraints(self, exclude=None):
+        """
+        Check the model constraints, reporting a clash with the
+        case-insensitive name constraint against the name field.
+        """
+        try:
+            super().validate_constraints(exclude=exclude)
+        except ValidationError as error:
+            errors = error.update_error_dict({})
+            general = errors.pop(NON_FIELD_ERRORS, [])
+            for item in general:
+                if item.message == NAME_TAKEN:
+                    errors.setdefault('name', []).append(item)
+                else:
+                    errors.setdefault(NON_FIELD_ERRORS, []).append(item)
+            raise ValidationError(errors)
+
+    @property
+    def attendance_rate(self):
+        """
+        Percentage of marked places filled across all registers, or None
+        if no register has been taken yet.
+        """
+        if not self.attendance_marked:
+            return None
+        return round(self.attendance_present * 100 / self.attendance_marked)
+
+    def save(self, *args, **kwargs):
+        """
+        Save the club without overwriting the live counters, which
+        may have moved on since this instance was loaded.
+        """
+        if self._state.adding:
+            self.seats_remaining = max(
+                self.capacity - self.active_enrollment_count, 0
+            )
+            return super().save(*args, **kwargs)
+
+        if kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+        # Capacity may have changed, so recompute seats from the stored count
+        Club.objects.filter(pk=self.pk).adjust_enrollment_count(0)
+        notify_seat_change(self.pk)
+        self.refresh_from_db(fields=self.COUNTER_FIELDS)
+
     def __str__(self):
         teacher_name = (
             f"{self.teacher.first_name or ''} "
@@ -45,3 +196,47 @@ class Club(models.Model):
         ).strip()
 
         return f"{self.name} (by {teacher_name})"
+
+
+class ClubSessionQuerySet(models.QuerySet):
+    def between(self, first_day, last_day):
+        """
+        Sessions from first_day to last_day inclusive, in time order.
+        A single range scan over the (date, start_time) index.
+        """
+        return self.filter(
+            date__range=(first_day, last_day)
+        ).order_by('date', 'start_time')
+
+
+class ClubSession(models.Model):
+    """
+    One dated occurrence of a club, expanded from its schedule.
+    Kept in step with the club by `club.services.sync_sessions`.
+    """
+    club = models.ForeignKey(Club,
+                             on_delete=models.CASCADE,
+                             related_name='sessions')
+    date = models.DateField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    objects = ClubSessionQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['date', 'start_time']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['club', 'date'],
+                name='unique_club_session_date',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['date', 'start_time'],
+                name='clubsession_date_time_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.club.name} on {self.date:%d %b %Y}"
@@ -0,0 +1,192 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from enrollment.models import Enrollment
+from enrollment.summary import drop_child_summaries
+from enrollment.validation import age_on
+from .dashboard import drop_teacher_caches
+from .imports import ClubRowForm, name_key
+from .models import NAME_TAKEN, Club
+from .services import create_sessions
+
+NAME_LENGTH = Club._meta.get_field('name').max_length
+
+
+class ClubRollover:
+    """
+    Result of cloning clubs into a new term.
+    Each problem adds a (club name, message) pair to `errors`; nothing
+    is saved unless every clone is valid. Clubs with no sessions in the
+    new term are left out and listed the same way in `skipped`.
+    """
+    def __init__(self):
+        self.clubs = []
+        self.enrollments = []
+        self.errors = []
+        self.skipped = []
+
+    def add(self, name, message):
+        self.errors.append((name, message))
+
+    def skip(self, name, message):
+        self.skipped.append((name, message))
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+
+def term_dates(club, term_start, term_end, offset):
+    """
+    Return a clone's (start_date, end_date) in the new term. Recurring
+    clubs fill the term, weekly ones keeping their weekday; one-off
+    events move by the gap between the starts of the old and new terms.
+    """
+    if club.frequency == 'one-off':
+        day = club.start_date + offset
+        return day, day
+    start = term_start
+    if club.frequency == 'weekly':
+        start += timedelta(
+            days=(club.start_date.weekday() - start.weekday()) % 7
+        )
+    return start, term_end
+
+
+def clone_name(name, suffix):
+    suffix = f' ({suffix})'
+    return name[:NAME_LENGTH - len(suffix)] + suffix
+
+
+def clone_clubs(clubs, source_start, term_start, term_end, suffix,
+                carry_enrollments=False, dry_run=False):
+    """
+    Clone clubs of the term that began on source_start into the term from
+    term_start to term_end, naming each clone with the suffix, e.g.
+    "Chess Club (Spring 2027)". One-off events that would fall outside
+    the new term, as when it is shorter than the old one, are skipped.
+    Every clone is checked with the ClubForm rules and all names with one
+    query; if all pass, the clones, their sessions and any carried-over
+    enrollments are inserted in bulk in one transaction.
+    With carry_enrollments, children actively enrolled in a club are
+    enrolled in its clone if they are still within its age limits.
+    Returns a ClubRollover holding the clones or the errors.
+    """
+    result = ClubRollover()
+    clubs = list(clubs.order_by('pk'))
+    if not clubs:
+        result.add('', 'Choose at least one club to roll over.')
+        return result
+
+    offset = term_start - source_start
+    clones = {}
+    names = {}
+    for club in clubs:
+        if club.start_date is None:
+            result.add(club.name, 'The club has no dates to roll over.')
+            continue
+        start_date, end_date = term_dates(club, term_start, term_end, offset)
+        clone = Club(
+            teacher_id=club.teacher_id,
+            name=clone_name(club.name, suffix),
+            club_or_event=club.club_or_event,
+            description=club.description,
+            min_age=club.min_age,
+            max_age=club.max_age,
+            capacity=club.capacity,
+            start_time=club.start_time,
+            end_time=club.end_time,
+            start_date=start_date,
+            end_date=end_date,
+            frequency=club.frequency,
+        )
+        if not term_start <= start_date <= end_date <= term_end:
+            result.skip(
+                club.name, 'Not copied: it has no sessions in the new term.'
+            )
+            continue
+
+        form = ClubRowForm({
+            field: getattr(clone, field) for field in ClubRowForm.Meta.fields
+        })
+        if not form.is_valid():
+            for field, messages in form.errors.items():
+                label = field if field != '__all__' else 'club'
+                for message in messages:
+                    result.add(club.name, f"{label}: {message}")
+            continue
+
+        key = name_key(clone.name)
+        if key in names:
+            result.add(club.name, f"name: Clashes with {names[key]}.")
+            continue
+        names[key] = club.name
+        clones[club.pk] = clone
+
+    # One query for every clone name
+    taken = set(
+        Club.objects
+        .annotate(lower_name=Lower('name'))
+        .filter(lower_name__in=list(names))
+        .values_list('lower_name', flat=True)
+    ) if names else set()
+    for club in clubs:
+        clone = clones.get(club.pk)
+        if clone is not None and name_key(clone.name) in taken:
+            result.add(club.name, f"name: {clone.name} is already taken.")
+
+    if not result.is_valid:
+        return result
+
+    carried = []
+    if carry_enrollments:
+        for club_id, child_id, born in (
+            Enrollment.objects
+            .active()
+            .filter(club_id__in=list(clones))
+            .values_list('club_id', 'child_id', 'child__date_of_birth')
+        ):
+            clone = clones[club_id]
+            age = age_on(born, term_start) if born else None
+            if age is not None and (
+                (clone.min_age is not None and age < clone.min_age)
+                or (clone.max_age is not None and age > clone.max_age)
+            ):
+                continue
+            carried.append((club_id, child_id))
+
+    # bulk_create skips Club.save and the enrollment signals, so the
+    # seat counters are filled in before the clubs are inserted
+    counts = Counter(club_id for club_id, _ in carried)
+    for club_id, clone in clones.items():
+        clone.active_enrollment_count = counts[club_id]
+        clone.seats_remaining = max(
+            clone.capacity - clone.active_enrollment_count, 0
+        )
+    result.clubs = list(clones.values())
+    result.enrollments = [
+        Enrollment(club=clones[club_id], child_id=child_id)
+        for club_id, child_id in carried
+    ]
+    if dry_run:
+        return result
+
+    try:
+        with transaction.atomic():
+            Club.objects.bulk_create(result.clubs, batch_size=500)
+            create_sessions(result.clubs)
+            Enrollment.objects.bulk_create(
+                result.enrollments, batch_size=500
+            )
+            drop_teacher_caches(
+                *(clone.teacher_id for clone in result.clubs)
+            )
+            drop_child_summaries(*(child_id for _, child_id in carried))
+    except IntegrityError:
+        # Another teacher took one of the names after the check above
+        result.clubs, result.enrollments = [], []
+        result.add('', f"name: {NAME_TAKEN} Please check and try again.")
+    return result
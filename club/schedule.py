@@ -0,0 +1,91 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+# Gap between consecutive sessions for each recurring frequency
+FREQUENCY_STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+# Fields needed to expand a club into its sessions
+SCHEDULE_FIELDS = (
+    'id',
+    'name',
+    'frequency',
+    'start_date',
+    'end_date',
+    'start_time',
+    'end_time',
+)
+
+
+def occurrences(club):
+    """
+    Yield a (start, end) datetime pair for every session of a club,
+    expanded from its start/end dates, frequency and times.
+    """
+    if club.start_date is None:
+        return
+    last_day = club.end_date or club.start_date
+    step = FREQUENCY_STEPS.get(club.frequency)
+
+    day = club.start_date
+    while day <= last_day:
+        yield (
+            datetime.combine(day, club.start_time),
+            datetime.combine(day, club.end_time),
+        )
+        if step is None:
+            break
+        day += step
+
+
+class ScheduleIndex:
+    """
+    Sorted interval index over the sessions of a set of clubs.
+    Answers "does this session clash" with a binary search.
+    """
+    def __init__(self, clubs):
+        intervals = sorted(
+            (
+                (start, end, club)
+                for club in clubs
+                for start, end in occurrences(club)
+            ),
+            key=lambda interval: interval[0]
+        )
+        self._starts = [start for start, _, _ in intervals]
+        self._ends = [end for _, end, _ in intervals]
+        self._clubs = [club for _, _, club in intervals]
+        # Running maximum of end times, so overlapping sessions are found
+        # even when an earlier session outlasts a later one
+        self._max_ends = list(accumulate(self._ends, max))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def clash_with_session(self, start, end):
+        """
+        Return the club with a session overlapping start-end, or None.
+        """
+        # Sessions starting before `end` are the first `position` entries
+        position = bisect_left(self._starts, end)
+        if position == 0 or self._max_ends[position - 1] <= start:
+            return None
+
+        index = position - 1
+        while self._ends[index] <= start:
+            index -= 1
+        return self._clubs[index]
+
+    def clash_with_club(self, club):
+        """
+        Return the first indexed club clashing with any session of
+        the given club, or None if the schedules fit together.
+        """
+        for start, end in occurrences(club):
+            clashing_club = self.clash_with_session(start, end)
+            if clashing_club is not None:
+                return clashing_club
+        return None
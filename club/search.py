@@ -0,0 +1,155 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import Q
+
+from . import catalogue
+
+SEARCH_TABLE = 'club_search'
+SEARCH_CONFIG = 'english'
+INDEX_NAME = 'club_search_idx'
+
+# Matches in the name count for more than matches in the description
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Kept identical to the GIN index expression so Postgres can use it
+SEARCH_VECTOR = (
+    SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+)
+
+# SQLite keeps an FTS5 table over club_club in step with triggers,
+# so every insert, update and delete updates the index incrementally.
+# SQLite drops the triggers when a migration rebuilds club_club, so such
+# a migration must end with restore_sqlite_search.
+SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        name, description,
+        content='club_club', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON club_club BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON club_club BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {SEARCH_TABLE}_update
+    AFTER UPDATE OF name, description ON club_club BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+
+def restore_sqlite_search(apps, schema_editor):
+    """
+    RunPython step that recreates the SQLite search table and triggers
+    after a migration has rebuilt club_club.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SQLITE_DROP + SQLITE_CREATE:
+            schema_editor.execute(statement)
+
+
+def search_index():
+    """
+    GIN index over the weighted search vector, for Postgres.
+    """
+    from django.contrib.postgres.indexes import GinIndex
+    return GinIndex(SEARCH_VECTOR, name=INDEX_NAME)
+
+
+def search_terms(text):
+    """
+    Split free text into plain word terms, dropping any search syntax.
+    """
+    return re.findall(r'\w+', text)
+
+
+def _sqlite_search(clubs, terms, offset, limit):
+    # Quoting each term stops FTS5 reading it as an operator
+    match = ' '.join(f'"{term}"' for term in terms)
+    club_sql, club_params = clubs.values('id').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT rowid FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({club_sql})
+            ORDER BY bm25({SEARCH_TABLE}, %s, %s), rowid
+            LIMIT %s OFFSET %s
+            """,
+            [match, *club_params, NAME_WEIGHT, DESCRIPTION_WEIGHT,
+             limit, offset]
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    found = clubs.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def _postgres_search(clubs, terms, offset, limit):
+    query = SearchQuery(' '.join(terms), config=SEARCH_CONFIG)
+    return list(
+        clubs
+        .annotate(
+            search=SEARCH_VECTOR,
+            rank=SearchRank(SEARCH_VECTOR, query)
+        )
+        .filter(search=query)
+        .order_by('-rank', 'id')[offset:offset + limit]
+    )
+
+
+def _fallback_search(clubs, terms, offset, limit):
+    for term in terms:
+        clubs = clubs.filter(
+            Q(name__icontains=term) | Q(description__icontains=term)
+        )
+    return list(clubs.order_by('name', 'id')[offset:offset + limit])
+
+
+def search_clubs(clubs, text, page=1, page_size=None):
+    """
+    Return one page of the clubs in `clubs` matching `text`, best match
+    first, and whether another page follows. Uses the FTS5 table on
+    SQLite and the GIN-indexed search vector on Postgres.
+    """
+    page_size = page_size or catalogue.PAGE_SIZE
+    terms = search_terms(text)
+    if not terms:
+        return [], False
+
+    search = {
+        'sqlite': _sqlite_search,
+        'postgresql': _postgres_search,
+    }.get(connection.vendor, _fallback_search)
+
+    # One extra row tells us whether another page follows
+    results = search(clubs, terms, (page - 1) * page_size, page_size + 1)
+    return results[:page_size], len(results) > page_size
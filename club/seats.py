@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+import time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'seats:version'
+CHANGES_KEY = 'seats:changes:{}'
+# How long a change notification is kept for hubs that have not seen it
+CHANGE_TTL = 120
+# Seconds between hub checks for new notifications
+POLL_INTERVAL = 1
+# Comment line sent on a quiet stream so proxies keep it open
+KEEPALIVE_INTERVAL = 15
+# Streams close after this many seconds and the browser reconnects
+STREAM_LIFETIME = 300
+MAX_STREAM_CLUBS = 100
+
+
+def parse_club_ids(value):
+    """
+    Club ids from a comma-separated ?clubs= parameter, capped at
+    MAX_STREAM_CLUBS; anything that is not a number is skipped.
+    """
+    return [
+        int(pk) for pk in value.split(',') if pk.isdigit()
+    ][:MAX_STREAM_CLUBS]
+
+
+def notify_seat_change(*club_ids):
+    """
+    Announce that the seat counters of some clubs have changed, once the
+    current transaction commits. Notifications live in the cache, so the
+    hub in every worker process sees them.
+    """
+    transaction.on_commit(partial(_publish, club_ids))
+
+
+def _publish(club_ids):
+    cache.add(VERSION_KEY, 0, timeout=None)
+    version = cache.incr(VERSION_KEY)
+    cache.set(CHANGES_KEY.format(version), list(club_ids), timeout=CHANGE_TTL)
+
+
+class SeatHub:
+    """
+    Per-process fan-out of seat changes to every open seat stream.
+    Streams ask the hub for changes instead of polling the cache and
+    database themselves: whichever stream finds the hub due refreshes
+    it, with one cache read and at most one query for all of them.
+    """
+    def __init__(self):
+        self.version = None
+        # Bumped when notifications were lost (expired, or the cache was
+        # cleared) so streams know to re-read all their clubs
+        self.generation = 0
+        self.seats = {}
+        self.changed_at = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def due(self):
+        return time.monotonic() - self._checked >= POLL_INTERVAL
+
+    def refresh(self):
+        """
+        Pick up notifications published since the last refresh and read
+        the seat counters of the clubs they name.
+        """
+        from .models import Club
+
+        # Streams that lose the race keep the current state
+        if not self.due() or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked = time.monotonic()
+            version = cache.get(VERSION_KEY, 0)
+            if self.version is None:
+                self.version = version
+                return
+            if version == self.version:
+                return
+
+            pending = range(self.version + 1, version + 1)
+            changes = cache.get_many(
+                [CHANGES_KEY.format(number) for number in pending]
+            )
+            if version < self.version or len(changes) < len(pending):
+                self.generation += 1
+                self.seats.clear()
+                self.changed_at.clear()
+                self.version = version
+                return
+
+            club_ids = set().union(*changes.values())
+            for pk, seats in Club.objects.filter(
+                pk__in=club_ids
+            ).values_list('pk', 'seats_remaining'):
+                self.seats[pk] = seats
+                self.changed_at[pk] = version
+            self.version = version
+        finally:
+            self._lock.release()
+
+    def changes_since(self, version, generation, club_ids):
+        """
+        Return the hub's (version, generation) and the new seat counts of
+        the given clubs changed after `version`. The counts are None when
+        notifications were lost and the stream must re-read its clubs.
+        """
+        if generation != self.generation:
+            changes = None
+        else:
+            changes = {
+                pk: self.seats[pk]
+                for pk in club_ids
+                if self.changed_at.get(pk, 0) > version
+            }
+        return self.version or 0, self.generation, changes
+
+
+hub = SeatHub()
+
+
+def seat_event(seats):
+    return f"event: seats\ndata: {json.dumps(seats)}\n\n"
+
+
+async def seat_counts(club_ids):
+    from .models import Club
+
+    return {
+        pk: seats
+        async for pk, seats in Club.objects.filter(
+            pk__in=club_ids
+        ).values_list('pk', 'seats_remaining')
+    }
+
+
+async def seat_events(club_ids):
+    """
+    Server-Sent Events for the seat counts of some clubs: a snapshot
+    first, then only the clubs whose counts change, read from the hub.
+    """
+    yield "retry: 3000\n\n"
+    if hub.due():
+        await sync_to_async(hub.refresh)()
+    version, generation = hub.version or 0, hub.generation
+    yield seat_event(await seat_counts(club_ids))
+
+    started = last_sent = time.monotonic()
+    while time.monotonic() - started < STREAM_LIFETIME:
+        await asyncio.sleep(POLL_INTERVAL)
+        if hub.due():
+            await sync_to_async(hub.refresh)()
+        version, generation, changes = hub.changes_since(
+            version, generation, club_ids
+        )
+        if changes is None:
+            changes = await seat_counts(club_ids)
+
+        if changes:
+            yield seat_event(changes)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= KEEPALIVE_INTERVAL:
+            yield ": keepalive\n\n"
+            last_sent = time.monotonic()
@@ -0,0 +1,83 @@
+from django.db import transaction
+
+from enrollment.services import discount_attendance
+from enrollment.summary import drop_club_summaries
+from .schedule import occurrences
+
+
+def expected_sessions(club):
+    """
+    Map each session date of a club to its (start_time, end_time),
+    reading the schedule expander one occurrence at a time.
+    """
+    return {
+        start.date(): (start.time(), end.time())
+        for start, end in occurrences(club)
+    }
+
+
+def sync_sessions(club):
+    """
+    Bring a club's stored sessions in line with its schedule.
+    Only the difference is written: sessions on dropped dates are
+    deleted, sessions whose times moved are updated and new dates are
+    inserted; unchanged sessions are left alone.
+    Returns the number of sessions (created, updated, deleted).
+    """
+    Session = club.sessions.model
+    wanted = expected_sessions(club)
+
+    with transaction.atomic():
+        stored = {
+            day: (pk, times)
+            for pk, day, *times in club.sessions.values_list(
+                'pk', 'date', 'start_time', 'end_time'
+            )
+        }
+
+        deleted = [
+            pk for day, (pk, _) in stored.items() if day not in wanted
+        ]
+        updated = [
+            Session(pk=pk, start_time=wanted[day][0], end_time=wanted[day][1])
+            for day, (pk, times) in stored.items()
+            if day in wanted and tuple(times) != wanted[day]
+        ]
+        created = [
+            Session(club=club, date=day, start_time=start, end_time=end)
+            for day, (start, end) in wanted.items()
+            if day not in stored
+        ]
+
+        if deleted:
+            # Registers taken on dropped dates leave the attendance totals
+            discount_attendance(club.pk, deleted)
+            Session.objects.filter(pk__in=deleted).delete()
+        if updated:
+            Session.objects.bulk_update(
+                updated, ['start_time', 'end_time'], batch_size=500
+            )
+        if created:
+            Session.objects.bulk_create(created, batch_size=500)
+        if created or updated or deleted:
+            drop_club_summaries(club.pk)
+
+    return len(created), len(updated), len(deleted)
+
+
+def create_sessions(clubs):
+    """
+    Insert the sessions of newly created clubs in bulk, so an import of
+    many clubs costs a handful of INSERTs rather than a sync per club.
+    Returns the number of sessions created.
+    """
+    if not clubs:
+        return 0
+    Session = clubs[0].sessions.model
+    sessions = [
+        Session(club=club, date=day, start_time=start, end_time=end)
+        for club in clubs
+        for day, (start, end) in expected_sessions(club).items()
+    ]
+    Session.objects.bulk_create(sessions, batch_size=500)
+    return len(sessions)
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cards import card_key
+from .dashboard import drop_teacher_caches
+from .models import Club
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def drop_club_card(sender, instance, **kwargs):
+    """
+    Drop the cached catalogue card of a saved or deleted club.
+    """
+    cache.delete(card_key(instance.pk))
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def drop_club_teacher_caches(sender, instance, **kwargs):
+    """
+    Drop the cached dashboard figures and access index of the club's
+    teacher.
+    """
+    drop_teacher_caches(instance.teacher_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def drop_teacher_club_cards(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop the cached cards of a teacher's clubs when the teacher is saved.
+    Logging in only touches last_login, which is not on the cards.
+    """
+    if instance.role != 'teacher' or update_fields == {'last_login'}:
+        return
+    cache.delete_many([
+        card_key(pk) for pk in instance.clubs.values_list('pk', flat=True)
+    ])
@@ -0,0 +1,32 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+# Chunks fetched per trip to the sync thread when streaming under ASGI
+STREAM_BATCH = 200
+
+
+async def in_batches(chunks):
+    """
+    Iterate a sync iterator asynchronously, fetching STREAM_BATCH chunks
+    at a time in the thread that runs sync code, where the view opened
+    its database cursor.
+    """
+    chunks = iter(chunks)
+    next_batch = sync_to_async(lambda: list(islice(chunks, STREAM_BATCH)))
+    while batch := await next_batch():
+        for chunk in batch:
+            yield chunk
+
+
+def streaming_response(chunks, **kwargs):
+    """
+    StreamingHttpResponse for a sync iterator that streams under either
+    deployment. Under ASGI Django reads a sync iterator to the end before
+    sending anything, so there it is handed over in batches instead.
+    """
+    if settings.ASGI_DEPLOYMENT:
+        chunks = in_batches(chunks)
+    return StreamingHttpResponse(chunks, **kwargs)
@@ -108,3 +108,38 @@ class ClubFormTest(TestCase):
             form.errors['start_date'][0],
             'Start date cannot be in the past.'
         )
+
+    def test_duplicate_name_any_case(self):
+        """
+        Should reject a name already used in a different case, with a
+        single query against the case-insensitive unique index.
+        """
+        Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today(),
+            end_date=date.today(),
+        )
+        data = {
+            'name': 'CHESS club',
+            'club_or_event': 'club',
+            'description': 'Fun chess activities',
+            'min_age': 8,
+            'max_age': 15,
+            'capacity': 10,
+            'start_time': time(15, 0),
+            'end_time': time(16, 0),
+            'start_date': date.today(),
+            'end_date': date.today(),
+            'frequency': 'one-off',
+        }
+
+        form = ClubForm(data=data)
+        with self.assertNumQueries(1):
+            self.assertFalse(form.is_valid())
+        self.assertEqual(
+            form.errors['name'], ['A club with this name already exists.']
+        )
@@ -1,8 +1,25 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
 from datetime import date, time, timedelta
-from club.models import Club
+import zipfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+from club.imports import import_clubs
+from club.models import NAME_TAKEN, Club, ClubSession
+from club.services import sync_sessions
+from club.calendar import feed_token, utc_stamp
+from club.seats import SeatHub
+from club.cards import attach_card_html, card_key
+from club.search import search_clubs
+from child.models import Child
+from enrollment.models import Enrollment
+from enrollment.services import release_seat
 
 User = get_user_model()
 
@@ -71,6 +88,41 @@ class ClubViewsTest(TestCase):
             )
         self.assertFalse(Club.objects.filter(name='Chess Club').exists())
 
+    def test_create_club_double_submit(self):
+        """
+        A repeated submit with the same idempotency key should not
+        report the first club as a duplicate name.
+        """
+        cache.clear()
+        data = {**self.valid_club_data, 'idempotency_key': 'retry'}
+        self.client.post(reverse('club:create_club'), data=data)
+        response = self.client.post(
+            reverse('club:create_club'), data=data, follow=True
+            )
+        self.assertContains(response, 'Club/Event created successfully!')
+        self.assertNotContains(response, 'already exists')
+        self.assertEqual(Club.objects.filter(name='Chess Club').count(), 1)
+
+    def test_create_club_name_race(self):
+        """
+        A duplicate name that slips past validation should be caught by
+        the unique index and shown as the usual form error.
+        """
+        Club.objects.create(
+            teacher=self.teacher,
+            name='CHESS CLUB',
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+        )
+        with mock.patch.object(Club, 'validate_constraints'):
+            response = self.client.post(
+                reverse('club:create_club'), data=self.valid_club_data
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'A club with this name already exists.')
+        self.assertEqual(Club.objects.count(), 1)
+
     def test_list_teacher_clubs(self):
         """
         Teacher should see only their clubs.
@@ -92,3 +144,923 @@ class ClubViewsTest(TestCase):
         response = self.client.get(reverse('club:list_teacher_clubs'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'My Club')
+
+
+class SeatCounterTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.child = Child.objects.create(
+            first_name='Child',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.club = Club.objects.create(
+            name='Chess Club',
+            teacher=self.teacher,
+            capacity=3,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today(),
+            end_date=date.today(),
+        )
+
+    def test_counters_follow_enrollments(self):
+        """
+        Enrolling and deleting should move the live seat counters.
+        """
+        self.assertEqual(self.club.seats_remaining, 3)
+        enrollment = Enrollment.objects.create(
+            child=self.child, club=self.club
+        )
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.active_enrollment_count, 1)
+        self.assertEqual(self.club.seats_remaining, 2)
+
+        enrollment.delete()
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.active_enrollment_count, 0)
+        self.assertEqual(self.club.seats_remaining, 3)
+
+    def test_capacity_change_recomputes_seats(self):
+        """
+        Saving a new capacity should recompute the remaining seats
+        without overwriting the enrollment counter.
+        """
+        Enrollment.objects.create(child=self.child, club=self.club)
+        self.club.capacity = 5
+        self.club.save()
+        self.assertEqual(self.club.active_enrollment_count, 1)
+        self.assertEqual(self.club.seats_remaining, 4)
+
+    def test_reconcile_seat_counts(self):
+        """
+        The reconcile command should repair drifted counters.
+        """
+        Enrollment.objects.create(child=self.child, club=self.club)
+        Club.objects.filter(pk=self.club.pk).update(
+            active_enrollment_count=0, seats_remaining=0
+        )
+        call_command('reconcile_seat_counts', stdout=StringIO())
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.active_enrollment_count, 1)
+        self.assertEqual(self.club.seats_remaining, 2)
+
+
+class ClubSearchTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+
+    def make_club(self, name, description):
+        return Club.objects.create(
+            teacher=self.teacher,
+            name=name,
+            description=description,
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today() + timedelta(days=1),
+        )
+
+    def search(self, text):
+        clubs, _ = search_clubs(Club.objects.all(), text)
+        return [club.name for club in clubs]
+
+    def test_name_matches_rank_first(self):
+        """
+        A match in the club name should outrank one in the description.
+        """
+        self.make_club('Board Games', 'Includes some chess')
+        self.make_club('Chess Club', 'Learn the openings')
+        self.make_club('Football', 'Five-a-side')
+        self.assertEqual(self.search('chess'), ['Chess Club', 'Board Games'])
+
+    def test_index_follows_saves_and_deletes(self):
+        """
+        Renaming or deleting a club should update the search index.
+        """
+        club = self.make_club('Chess Club', '')
+        club.name = 'Drama Club'
+        club.save()
+        self.assertEqual(self.search('chess'), [])
+        self.assertEqual(self.search('drama'), ['Drama Club'])
+
+        club.delete()
+        self.assertEqual(self.search('drama'), [])
+
+
+class ClubSessionTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.start = date.today() + timedelta(days=1)
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=self.start,
+            end_date=self.start + timedelta(weeks=3),
+            frequency='weekly'
+        )
+        sync_sessions(self.club)
+
+    def test_weekly_club_expands_to_sessions(self):
+        """
+        A weekly club should store one session per week.
+        """
+        self.assertEqual(
+            list(self.club.sessions.values_list('date', flat=True)),
+            [self.start + timedelta(weeks=week) for week in range(4)]
+        )
+        self.assertEqual(
+            ClubSession.objects.between(self.start, self.start).count(), 1
+        )
+
+    def test_resync_only_writes_the_difference(self):
+        """
+        Shortening the club should delete only the dropped sessions and
+        leave the rest untouched; an unchanged club writes nothing.
+        """
+        kept = list(self.club.sessions.values_list('pk', flat=True)[:2])
+        self.club.end_date = self.start + timedelta(weeks=1)
+        self.club.save()
+
+        self.assertEqual(sync_sessions(self.club), (0, 0, 2))
+        self.assertEqual(
+            list(self.club.sessions.values_list('pk', flat=True)), kept
+        )
+        self.assertEqual(sync_sessions(self.club), (0, 0, 0))
+
+    def test_time_change_updates_sessions(self):
+        """
+        Moving the club's times should update the stored sessions.
+        """
+        self.club.start_time = time(14, 0)
+        self.club.save()
+
+        self.assertEqual(sync_sessions(self.club), (0, 4, 0))
+        self.assertFalse(
+            self.club.sessions.exclude(start_time=time(14, 0)).exists()
+        )
+
+
+class CalendarFeedTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.child = Child.objects.create(
+            first_name='Tom',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        start = date.today() + timedelta(days=1)
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            description='Openings, endgames; tactics',
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=start,
+            end_date=start + timedelta(weeks=2),
+            frequency='weekly'
+        )
+        sync_sessions(self.club)
+        Enrollment.objects.create(child=self.child, club=self.club)
+
+    def feed_url(self, user):
+        return reverse(
+            'club:calendar_feed', args=[user.role, feed_token(user)]
+        )
+
+    def test_teacher_feed_streams_every_session(self):
+        """
+        The teacher feed should stream one escaped VEVENT per session.
+        """
+        response = self.client.get(self.feed_url(self.teacher))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+        self.assertNotIn('TZID', body)
+        self.assertIn('Openings\\, endgames\\; tactics', body)
+
+    def test_session_times_are_written_in_utc(self):
+        """
+        Local session times should be converted to UTC, following the
+        clock change, so no VTIMEZONE is needed.
+        """
+        self.assertEqual(
+            utc_stamp(date(2025, 1, 15), time(15, 0)), '20250115T150000Z'
+        )
+        self.assertEqual(
+            utc_stamp(date(2025, 7, 15), time(15, 0)), '20250715T140000Z'
+        )
+
+    def test_parent_feed_lists_enrolled_children(self):
+        """
+        The parent feed should name the child on each session.
+        """
+        response = self.client.get(self.feed_url(self.parent))
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('SUMMARY:Tom: Chess Club'), 3)
+
+    def test_unchanged_feed_returns_not_modified(self):
+        """
+        Polling with the last ETag should get a 304 without the feed.
+        """
+        url = self.feed_url(self.parent)
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalid_token_is_not_found(self):
+        """
+        A tampered token or one used with the wrong role should 404.
+        """
+        token = feed_token(self.parent)
+        url = reverse('club:calendar_feed', args=['teacher', token])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_reset_link_revokes_old_feed(self):
+        """
+        Resetting the link from the dashboard should stop the old feed
+        URL working and hand out a new one.
+        """
+        old_url = self.feed_url(self.parent)
+        self.client.login(email='parent1@example.com', password='pass123')
+        response = self.client.post(reverse('user:reset_calendar_feed'))
+        self.assertRedirects(response, reverse('user:parent_dashboard'))
+
+        self.parent.refresh_from_db()
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        self.assertEqual(
+            self.client.get(self.feed_url(self.parent)).status_code, 200
+        )
+
+
+@mock.patch('club.seats.POLL_INTERVAL', 0)
+class SeatHubTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.child = Child.objects.create(
+            first_name='Child',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.clubs = [
+            Club.objects.create(
+                teacher=self.teacher,
+                name=name,
+                capacity=3,
+                start_time=time(15, 0),
+                end_time=time(16, 0),
+                start_date=date.today() + timedelta(days=1),
+            )
+            for name in ('Chess Club', 'Drama Club')
+        ]
+        self.hub = SeatHub()
+        self.hub.refresh()
+
+    def test_one_refresh_serves_every_stream(self):
+        """
+        A committed enrollment should reach every stream watching its
+        club from a single hub refresh.
+        """
+        chess, drama = self.clubs
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(child=self.child, club=chess)
+
+        with self.assertNumQueries(1):
+            self.hub.refresh()
+
+        for watched, expected in (
+            ([chess.pk, drama.pk], {chess.pk: 2}),
+            ([chess.pk], {chess.pk: 2}),
+            ([drama.pk], {}),
+        ):
+            _, _, changes = self.hub.changes_since(0, 0, watched)
+            self.assertEqual(changes, expected)
+
+    def test_lost_notifications_force_a_reread(self):
+        """
+        If notifications expire before the hub sees them, streams are
+        told to re-read their clubs rather than miss changes.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(child=self.child, club=self.clubs[0])
+        cache.delete('seats:changes:1')
+        self.hub.refresh()
+
+        _, generation, changes = self.hub.changes_since(
+            0, 0, [self.clubs[0].pk]
+        )
+        self.assertIsNone(changes)
+        self.assertEqual(generation, 1)
+
+
+class ClubCardCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            capacity=3,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today() + timedelta(days=1),
+        )
+
+    def load_club(self):
+        return Club.objects.select_related('teacher').get(pk=self.club.pk)
+
+    def test_warm_card_is_not_rendered_again(self):
+        """
+        A cached card should be reused while the club is unchanged.
+        """
+        attach_card_html([self.load_club()])
+        with mock.patch('club.cards.render_to_string') as render:
+            club = attach_card_html([self.load_club()])[0]
+        render.assert_not_called()
+        self.assertIn('Chess Club', club.card_html)
+
+    def test_saving_the_club_drops_its_card(self):
+        """
+        Saving a club should drop its card and the next render shows
+        the new details.
+        """
+        attach_card_html([self.load_club()])
+        self.club.name = 'Drama Club'
+        self.club.save()
+        self.assertIsNone(cache.get(card_key(self.club.pk)))
+
+        club = attach_card_html([self.load_club()])[0]
+        self.assertIn('Drama Club', club.card_html)
+
+    def test_teacher_changes_refresh_cards(self):
+        """
+        Renaming the teacher should drop their club cards, but
+        logging in should not.
+        """
+        attach_card_html([self.load_club()])
+        self.client.login(email='teacher1@example.com', password='pass123')
+        self.assertIsNotNone(cache.get(card_key(self.club.pk)))
+
+        self.teacher.surname = 'Two'
+        self.teacher.save()
+        club = attach_card_html([self.load_club()])[0]
+        self.assertIn('Teacher Two', club.card_html)
+
+
+class ClubRosterTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.client.login(email='teacher1@example.com', password='pass123')
+
+    def add_club(self, name, children):
+        club = Club.objects.create(
+            teacher=self.teacher,
+            name=name,
+            capacity=40,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+        )
+        for i in range(children):
+            child = Child.objects.create(
+                first_name=f'Child{i}',
+                surname=name,
+                date_of_birth=date.today() - timedelta(days=8*365),
+                parent=self.parent
+            )
+            Enrollment.objects.create(child=child, club=club)
+        return club
+
+    def test_roster_query_count_is_constant(self):
+        """
+        The roster should cost the same number of queries however many
+        clubs and enrollments the teacher has.
+        """
+        url = reverse('club:view_club_enrollments')
+        self.add_club('Chess Club', 2)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+        for i in range(4):
+            self.add_club(f'Club {i}', 12)
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+
+        club = next(
+            club for club in response.context['page']
+            if club.name == 'Club 0'
+        )
+        self.assertEqual(club.enrolled, 12)
+        self.assertEqual(club.fill_rate, 30)
+        self.assertEqual(len(club.roster_preview), 10)
+        self.assertContains(response, 'View all 12 children')
+
+    def test_cancelled_enrollments_are_not_counted(self):
+        """
+        Cancelled enrollments should be left out of counts and lists.
+        """
+        club = self.add_club('Chess Club', 2)
+        club.enrollments.filter(child__first_name='Child0').update(
+            status='cancelled'
+        )
+        response = self.client.get(reverse('club:view_club_enrollments'))
+        club = response.context['page'][0]
+        self.assertEqual(club.enrolled, 1)
+        self.assertEqual(
+            [e.child.first_name for e in club.roster_preview], ['Child1']
+        )
+
+    def test_club_roster_is_paginated(self):
+        """
+        The full roster of a club should be split into pages.
+        """
+        club = self.add_club('Chess Club', 30)
+        url = reverse('club:club_roster', args=[club.id])
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(len(response.context['page']), 5)
+        self.assertEqual(response.context['page'].paginator.count, 30)
+
+    def test_child_details_use_the_access_index(self):
+        """
+        With the teacher's access index cached, a child's page should
+        cost one query beyond the session and user.
+        """
+        cache.clear()
+        club = self.add_club('Chess Club', 2)
+        child_id = club.enrollments.first().child_id
+        url = reverse('club:view_child_details', args=[child_id])
+        self.client.get(url)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.context['child'].pk, child_id)
+
+    def test_cancelled_child_is_removed_from_the_access_index(self):
+        """
+        Once a child's enrollment is cancelled, the teacher should no
+        longer be able to open the child's page.
+        """
+        cache.clear()
+        club = self.add_club('Chess Club', 1)
+        enrollment = club.enrollments.get()
+        url = reverse('club:view_child_details', args=[enrollment.child_id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            release_seat(enrollment)
+        self.assertRedirects(
+            self.client.get(url), reverse('club:view_club_enrollments')
+        )
+
+    def test_export_streams_csv_for_all_clubs(self):
+        """
+        The CSV export should stream every active enrollment across the
+        teacher's clubs, with formula-like text made inert.
+        """
+        self.add_club('Art Club', 1)
+        chess = self.add_club('Chess Club', 2)
+        child = chess.enrollments.get(child__first_name='Child0').child
+        child.allergy_info = '=HYPERLINK("x")'
+        child.emergency_contact_phone = '+44 7700 900123'
+        child.save()
+
+        response = self.client.get(reverse('club:export_roster'))
+        self.assertTrue(response.streaming)
+        self.assertIn('roster-all-clubs.csv', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode(
+            'utf-8-sig'
+        ).splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith('Art Club,'))
+        self.assertIn("'=HYPERLINK", lines[2])
+        self.assertIn(',+44 7700 900123,', lines[2])
+
+    @override_settings(ASGI_DEPLOYMENT=True)
+    def test_export_streams_asynchronously_under_asgi(self):
+        """
+        Under ASGI the export should be an async stream, which Django
+        sends as it is read rather than buffering it first.
+        """
+        self.add_club('Chess Club', 2)
+        response = self.client.get(reverse('club:export_roster'))
+        self.assertTrue(response.is_async)
+        lines = b''.join(response).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_export_xlsx_for_one_club(self):
+        """
+        A single club's export should be a workbook holding only that
+        club's children.
+        """
+        self.add_club('Art Club', 1)
+        chess = self.add_club('Chess Club', 2)
+        url = reverse('club:export_club_roster', args=[chess.id])
+        response = self.client.get(url, {'format': 'xlsx'})
+        data = b''.join(response.streaming_content)
+
+        with zipfile.ZipFile(BytesIO(data)) as workbook:
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('Chess Club', sheet)
+        self.assertNotIn('Art Club', sheet)
+
+    def test_export_of_another_teachers_club_is_not_found(self):
+        other = User.objects.create_user(
+            first_name='Teacher',
+            surname='Two',
+            email='teacher2@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        club = self.add_club('Chess Club', 1)
+        club.teacher = other
+        club.save()
+        url = reverse('club:export_club_roster', args=[club.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ClubImportTest(TestCase):
+    HEADER = (
+        'name,club_or_event,description,min_age,max_age,capacity,'
+        'start_time,end_time,start_date,end_date,frequency\n'
+    )
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.client.login(email='teacher1@example.com', password='pass123')
+        self.start = date.today() + timedelta(days=7)
+
+    def csv_for(self, *names):
+        day = self.start.isoformat()
+        return self.HEADER + ''.join(
+            f'{name},club,Fun,5,11,20,15:00,16:00,{day},{day},one-off\n'
+            for name in names
+        )
+
+    def test_command_imports_clubs_and_sessions(self):
+        path = Path(self.enterContext(TemporaryDirectory())) / 'clubs.csv'
+        path.write_text(self.csv_for(*(f'Club {i}' for i in range(50))))
+
+        out = StringIO()
+        # Teacher, name check, savepoint, two INSERTs, release
+        with self.assertNumQueries(6):
+            call_command(
+                'import_clubs', str(path), teacher='teacher1@example.com',
+                stdout=out
+            )
+        self.assertIn('Imported 50 club(s)', out.getvalue())
+        self.assertEqual(Club.objects.filter(teacher=self.teacher).count(), 50)
+        self.assertEqual(ClubSession.objects.count(), 50)
+        self.assertEqual(Club.objects.first().seats_remaining, 20)
+
+    def test_invalid_rows_are_reported_and_nothing_is_saved(self):
+        Club.objects.create(
+            teacher=self.teacher, name='Chess Club', capacity=10,
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+        content = self.csv_for('Art Club', 'CHESS CLUB', 'art club')
+        content += 'Drama,club,,5,11,0,16:00,15:00,,,weekly\n'
+        upload = SimpleUploadedFile('clubs.csv', content.encode())
+
+        response = self.client.post(
+            reverse('club:upload_clubs'), {'file': upload}
+        )
+        lines = [line for line, _ in response.context['errors']]
+        self.assertEqual(lines[:2], [3, 4])
+        self.assertIn(5, lines)
+        self.assertContains(response, 'Repeats the club on line 2')
+        self.assertEqual(Club.objects.count(), 1)
+
+    def test_taken_accented_name_is_reported_on_its_row(self):
+        """
+        A name the database's case-insensitive constraint would reject
+        should be reported on its row, accented letters included.
+        """
+        Club.objects.create(
+            teacher=self.teacher, name='École Chess', capacity=10,
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+        result = import_clubs(
+            self.teacher, StringIO(self.csv_for('Art Club', 'ÉCOLE CHESS'))
+        )
+        self.assertEqual(result.errors, [(3, f"name: {NAME_TAKEN}")])
+        self.assertEqual(Club.objects.count(), 1)
+
+    def test_upload_creates_clubs(self):
+        upload = SimpleUploadedFile(
+            'clubs.csv', self.csv_for('Art Club', 'Drama').encode()
+        )
+        response = self.client.post(
+            reverse('club:upload_clubs'), {'file': upload}
+        )
+        self.assertRedirects(response, reverse('club:list_teacher_clubs'))
+        self.assertEqual(Club.objects.filter(teacher=self.teacher).count(), 2)
+
+
+class AttendanceViewTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.client.login(email='teacher1@example.com', password='pass123')
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+        )
+        self.enrollments = [
+            Enrollment.objects.create(
+                club=self.club,
+                child=Child.objects.create(
+                    first_name=f'Child{i}',
+                    surname='One',
+                    date_of_birth=date.today() - timedelta(days=8*365),
+                    parent=parent
+                )
+            )
+            for i in range(3)
+        ]
+        self.session = ClubSession.objects.create(
+            club=self.club, date=date.today(),
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+
+    def test_register_is_marked_in_one_submit(self):
+        url = reverse(
+            'club:session_register', args=[self.club.id, self.session.id]
+        )
+        present = [self.enrollments[0].pk, self.enrollments[2].pk]
+        response = self.client.post(url, {'present': present})
+        self.assertRedirects(
+            response, reverse('club:club_attendance', args=[self.club.id])
+        )
+
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.attendance_rate, 67)
+        response = self.client.get(url)
+        self.assertEqual(response.context['form'].initial['present'], present)
+
+    def test_future_session_register_is_closed(self):
+        session = ClubSession.objects.create(
+            club=self.club, date=date.today() + timedelta(days=7),
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+        url = reverse(
+            'club:session_register', args=[self.club.id, session.id]
+        )
+        self.client.post(url, {'present': [self.enrollments[0].pk]})
+        self.assertFalse(session.attendance.exists())
+
+
+class ClubRolloverTest(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.client.login(email='teacher1@example.com', password='pass123')
+        # A Wednesday, so weekly clubs can be checked for their weekday
+        self.old_start = date(2025, 1, 8)
+        self.weekly = Club.objects.create(
+            teacher=self.teacher, name='Chess Club', capacity=10,
+            description='Chess', min_age=5, max_age=11, frequency='weekly',
+            start_time=time(15, 0), end_time=time(16, 0),
+            start_date=self.old_start,
+            end_date=self.old_start + timedelta(weeks=10),
+        )
+        self.event = Club.objects.create(
+            teacher=self.teacher, name='Science Fair', capacity=50,
+            description='Experiments', min_age=4, max_age=11,
+            club_or_event='event', frequency='one-off',
+            start_time=time(9, 0), end_time=time(12, 0),
+            start_date=self.old_start + timedelta(days=9),
+            end_date=self.old_start + timedelta(days=9),
+        )
+        for years in (8, 12):
+            Enrollment.objects.create(
+                club=self.weekly,
+                child=Child.objects.create(
+                    first_name=f'Age{years}',
+                    surname='One',
+                    date_of_birth=date.today() - timedelta(days=years*365),
+                    parent=parent
+                )
+            )
+        # Next Monday, at least a week away
+        today = date.today()
+        self.term_start = today + timedelta(days=7 - today.weekday() + 7)
+        self.term_end = self.term_start + timedelta(weeks=12)
+
+    def test_rollover_clones_clubs_sessions_and_enrollments(self):
+        response = self.client.post(reverse('club:rollover_clubs'), {
+            'clubs': [self.weekly.pk, self.event.pk],
+            'source_start': self.old_start,
+            'term_start': self.term_start,
+            'term_end': self.term_end,
+            'suffix': 'Spring',
+            'carry_enrollments': 'on',
+        })
+        self.assertRedirects(response, reverse('club:list_teacher_clubs'))
+
+        chess = Club.objects.get(name='Chess Club (Spring)')
+        self.assertEqual(chess.start_date.weekday(), 2)
+        self.assertEqual(chess.end_date, self.term_end)
+        self.assertEqual(chess.sessions.count(), 12)
+        # The older child is over the age limit in the new term
+        self.assertEqual(chess.active_enrollment_count, 1)
+        self.assertEqual(chess.seats_remaining, 9)
+        self.assertEqual(chess.enrollments.get().child.first_name, 'Age8')
+
+        fair = Club.objects.get(name='Science Fair (Spring)')
+        self.assertEqual(fair.start_date, self.term_start + timedelta(days=9))
+        self.assertEqual(fair.enrollments.count(), 0)
+
+    def test_taken_names_stop_the_whole_rollover(self):
+        other = User.objects.create_user(
+            first_name='Teacher',
+            surname='Two',
+            email='teacher2@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        Club.objects.create(
+            teacher=other, name='science fair (spring)', capacity=5,
+            start_time=time(9, 0), end_time=time(10, 0),
+        )
+        out = StringIO()
+        # Teacher, clubs and one name check; nothing is written
+        with self.assertRaises(CommandError), self.assertNumQueries(3):
+            call_command(
+                'rollover_clubs', '--start', self.term_start.isoformat(),
+                '--end', self.term_end.isoformat(), '--suffix', 'Spring',
+                '--from', self.old_start.isoformat(),
+                '--to', self.weekly.end_date.isoformat(),
+                '--teacher', 'teacher1@example.com', stderr=out
+            )
+        self.assertIn('Science Fair: name:', out.getvalue())
+        self.assertEqual(Club.objects.count(), 3)
+
+    def test_events_past_a_shorter_term_are_skipped(self):
+        """
+        A one-off event late in a long term should be left out and
+        reported, while the other clubs are still copied.
+        """
+        late = Club.objects.create(
+            teacher=self.teacher, name='Winter Show', capacity=80,
+            description='Show', min_age=4, max_age=11,
+            club_or_event='event', frequency='one-off',
+            start_time=time(18, 0), end_time=time(19, 0),
+            start_date=self.old_start + timedelta(weeks=13),
+            end_date=self.old_start + timedelta(weeks=13),
+        )
+        response = self.client.post(reverse('club:rollover_clubs'), {
+            'clubs': [self.weekly.pk, self.event.pk, late.pk],
+            'source_start': self.old_start,
+            'term_start': self.term_start,
+            'term_end': self.term_end,
+            'suffix': 'Spring',
+        }, follow=True)
+
+        self.assertTrue(
+            Club.objects.filter(name='Chess Club (Spring)').exists()
+        )
+        self.assertTrue(
+            Club.objects.filter(name='Science Fair (Spring)').exists()
+        )
+        self.assertFalse(
+            Club.objects.filter(name='Winter Show (Spring)').exists()
+        )
+        self.assertContains(response, 'Winter Show: Not copied')
+
+    def test_command_copies_only_the_current_term(self):
+        """
+        By default the command should copy the clubs of the term just
+        before the new one, not those of earlier terms.
+        """
+        Club.objects.create(
+            teacher=self.teacher, name='Robotics', capacity=10,
+            description='Robots', min_age=5, max_age=11, frequency='weekly',
+            start_time=time(15, 0), end_time=time(16, 0),
+            start_date=self.term_start - timedelta(weeks=12),
+            end_date=self.term_start - timedelta(days=1),
+        )
+        out = StringIO()
+        call_command(
+            'rollover_clubs', '--start', self.term_start.isoformat(),
+            '--end', self.term_end.isoformat(), '--suffix', 'Spring',
+            stdout=out
+        )
+        self.assertIn('Copied 1 club(s)', out.getvalue())
+        self.assertEqual(
+            list(Club.objects.filter(name__endswith='(Spring)').values_list(
+                'name', flat=True
+            )),
+            ['Robotics (Spring)']
+        )
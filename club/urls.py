@@ -1,19 +1,53 @@
 from django.urls import path
 from .views import (
     create_club,
+    upload_clubs,
+    rollover_clubs,
     list_teacher_clubs,
     manage_single_club,
     delete_club_confirm,
     view_club_enrollments,
     view_child_details,
+    calendar_feed,
+    club_roster,
+    club_attendance,
+    session_register,
+    export_roster,
 )
 
 app_name = 'club'
 
 urlpatterns = [
     path('create/', create_club, name='create_club'),
+    path('import/', upload_clubs, name='upload_clubs'),
+    path('rollover/', rollover_clubs, name='rollover_clubs'),
     path('my-clubs/', list_teacher_clubs, name='list_teacher_clubs'),
     path('<int:club_id>/', manage_single_club, name='manage_single_club'),
+    path(
+        '<int:club_id>/roster/',
+        club_roster,
+        name='club_roster',
+        ),
+    path(
+        '<int:club_id>/attendance/',
+        club_attendance,
+        name='club_attendance',
+        ),
+    path(
+        '<int:club_id>/attendance/<int:session_id>/',
+        session_register,
+        name='session_register',
+        ),
+    path(
+        '<int:club_id>/roster/export/',
+        export_roster,
+        name='export_club_roster',
+        ),
+    path(
+        'roster/export/',
+        export_roster,
+        name='export_roster',
+        ),
     path(
         '<int:club_id>/delete/',
         delete_club_confirm,
@@ -29,4 +63,9 @@ urlpatterns = [
         view_child_details,
         name="view_child_details"
         ),
+    path(
+        'calendar/<str:role>/<str:token>.ics',
+        calendar_feed,
+        name='calendar_feed'
+        ),
 ]
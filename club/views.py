@@ -1,17 +1,50 @@
 from django.contrib.auth.decorators import login_required
 from user.decorators import role_required
+from user.idempotency import idempotent
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.core.paginator import Paginator
+from django.db.models import (
+    Count, Exists, F, FloatField, OuterRef, Prefetch, Q
+)
+from django.db.models.functions import Cast, NullIf
+import io
 from datetime import date
 
 from child.models import Child
-from .models import Club
-from .forms import ClubForm
-from enrollment.models import Enrollment
+from .models import NAME_TAKEN, Club, ClubSession
+from .access import can_view_child
+from .calendar import (
+    FEED_ROLES,
+    feed_sessions,
+    feed_version,
+    ical_lines,
+    user_for_token,
+)
+from .exports import roster_csv, roster_rows, roster_xlsx
+from .forms import ClubForm, ClubImportForm, RegisterForm, RolloverForm
+from .imports import IMPORT_COLUMNS, import_clubs
+from .rollover import clone_clubs
+from .services import sync_sessions
+from .streaming import streaming_response
+from enrollment.models import Attendance, Enrollment
+from enrollment.services import mark_register, promote_waitlist
+
+CLUBS_PER_PAGE = 10
+# Children listed on each club card before linking to the full roster
+ROSTER_PREVIEW = 10
+ROSTER_PAGE_SIZE = 25
+SESSIONS_PER_PAGE = 20
 
 
 @login_required
 @role_required('teacher')
+@idempotent
 def create_club(request):
     """
     Create a new club or event managed by the teacher.
@@ -20,7 +53,6 @@ def create_club(request):
         form = ClubForm(request.POST)
         if form.is_valid():
             # Extract raw POST data
-            name = request.POST.get('name', '').strip()
             frequency = request.POST.get('frequency')
             start_date = request.POST.get('start_date')
             end_date = request.POST.get('end_date')
@@ -30,14 +62,6 @@ def create_club(request):
             end_time = request.POST.get('end_time')
             capacity = request.POST.get('capacity')
 
-            # Name uniqueness
-            if Club.objects.filter(name__iexact=name).exists():
-                messages.error(
-                    request,
-                    'A club with this name already exists.'
-                )
-                return render(request, 'club/create_club.html', {'form': form})
-
             # Age validation
             if min_age and max_age and int(min_age) > int(max_age):
                 messages.error(
@@ -78,7 +102,14 @@ def create_club(request):
             # Save club if all validations pass
             club = form.save(commit=False)
             club.teacher = request.user
-            club.save()
+            try:
+                with transaction.atomic():
+                    club.save()
+            except IntegrityError:
+                # Another request took the name after the form checked it
+                form.add_error('name', NAME_TAKEN)
+                return render(request, 'club/create_club.html', {'form': form})
+            sync_sessions(club)
             messages.success(request, "Club/Event created successfully!")
             return redirect('user:teacher_dashboard')
     else:
@@ -87,6 +118,83 @@ def create_club(request):
     return render(request, 'club/create_club.html', {'form': form})
 
 
+@login_required
+@role_required('teacher')
+@idempotent
+def upload_clubs(request):
+    """
+    Create many clubs at once from an uploaded CSV file.
+    Every row is checked first; if any row is invalid nothing is saved
+    and the errors are listed by line.
+    """
+    errors = []
+    if request.method == 'POST':
+        form = ClubImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            source = io.TextIOWrapper(
+                form.cleaned_data['file'], encoding='utf-8-sig',
+                errors='replace', newline=''
+            )
+            result = import_clubs(request.user, source)
+            if result.is_valid:
+                messages.success(
+                    request, f"Imported {len(result.clubs)} club(s)."
+                )
+                return redirect('club:list_teacher_clubs')
+            errors = result.errors
+            messages.error(request, "No clubs were imported.")
+    else:
+        form = ClubImportForm()
+
+    return render(request, 'club/import_clubs.html', {
+        'form': form,
+        'errors': errors,
+        'columns': IMPORT_COLUMNS,
+    })
+
+
+@login_required
+@role_required('teacher')
+@idempotent
+def rollover_clubs(request):
+    """
+    Copy a chosen set of the teacher's clubs into a new term in one go.
+    Every copy is checked first; if any fails nothing is saved and the
+    problems are listed by club.
+    """
+    errors = []
+    if request.method == 'POST':
+        form = RolloverForm(request.user, request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            result = clone_clubs(
+                data['clubs'],
+                data['source_start'],
+                data['term_start'],
+                data['term_end'],
+                data['suffix'],
+                carry_enrollments=data['carry_enrollments'],
+            )
+            if result.is_valid:
+                messages.success(
+                    request,
+                    f"Copied {len(result.clubs)} club(s) into the new term "
+                    f"with {len(result.enrollments)} enrollment(s)."
+                )
+                for name, message in result.skipped:
+                    messages.warning(request, f"{name}: {message}")
+                return redirect('club:list_teacher_clubs')
+            errors = result.errors
+            messages.error(request, "No clubs were copied.")
+    else:
+        form = RolloverForm(request.user)
+
+    return render(request, 'club/rollover_clubs.html', {
+        'form': form,
+        'errors': errors,
+    })
+
+
 @login_required
 @role_required('teacher')
 def list_teacher_clubs(request):
@@ -112,7 +220,6 @@ def manage_single_club(request, club_id):
         form = ClubForm(request.POST, instance=club)
         if form.is_valid():
             # Extract raw POST data
-            name = request.POST.get('name', '').strip()
             frequency = request.POST.get('frequency')
             start_date = request.POST.get('start_date')
             end_date = request.POST.get('end_date')
@@ -122,23 +229,6 @@ def manage_single_club(request, club_id):
             end_time = request.POST.get('end_time')
             capacity = request.POST.get('capacity')
 
-            # Name uniqueness
-            if (
-                Club.objects
-                .filter(name__iexact=name)
-                .exclude(id=club.id)
-                .exists()
-            ):
-                messages.error(
-                    request,
-                    'A club with this name already exists.'
-                )
-                return render(
-                    request,
-                    'club/manage_single_club.html',
-                    {'form': form, 'club': club}
-                    )
-
             # Age validation
             if min_age and max_age and int(min_age) > int(max_age):
                 messages.error(
@@ -197,7 +287,26 @@ def manage_single_club(request, club_id):
                     )
 
             # Save club if all validations pass
-            form.save()
+            try:
+                with transaction.atomic():
+                    form.save()
+            except IntegrityError:
+                # Another request took the name after the form checked it
+                form.add_error('name', NAME_TAKEN)
+                return render(
+                    request,
+                    'club/manage_single_club.html',
+                    {'form': form, 'club': club}
+                    )
+            sync_sessions(club)
+            # A capacity increase may free seats for waitlisted children
+            promoted = promote_waitlist(club)
+            if promoted:
+                messages.info(
+                    request,
+                    f"{len(promoted)} child(ren) moved from the waitlist "
+                    "into the club."
+                )
             messages.success(request, "Club updated successfully.")
             return redirect('club:list_teacher_clubs')
     else:
@@ -228,33 +337,193 @@ def delete_club_confirm(request, club_id):
 @role_required('teacher')
 def view_club_enrollments(request):
     """
-    View all enrollments for clubs managed by the teacher.
+    View all enrollments for clubs managed by the teacher, a page of
+    clubs at a time. Each club shows its counts and the first few
+    enrolled children; the full list is on the club's roster page.
     """
+    roster_preview = (
+        Enrollment.objects
+        .active()
+        .select_related('child')
+        .order_by('child__surname', 'child__first_name')
+    )
     clubs = (
         Club.objects
         .filter(teacher=request.user)
-        .prefetch_related('enrollments__child')
+        .annotate(
+            enrolled=Count(
+                'enrollments', filter=Q(enrollments__status='active')
+            )
+        )
+        .annotate(
+            fill_rate=(
+                Cast('enrolled', FloatField()) * 100
+                / NullIf(F('capacity'), 0)
+            )
+        )
+        .prefetch_related(Prefetch(
+            'enrollments',
+            queryset=roster_preview[:ROSTER_PREVIEW],
+            to_attr='roster_preview'
+        ))
+        .order_by('name', 'id')
     )
+    page = Paginator(clubs, CLUBS_PER_PAGE).get_page(request.GET.get('page'))
     context = {
-        'clubs': clubs
+        'page': page,
     }
     return render(request, 'club/view_club_enrollments.html', context)
 
 
+@login_required
+@role_required('teacher')
+def club_roster(request, club_id):
+    """
+    List every child actively enrolled in one of the teacher's clubs,
+    one page at a time.
+    """
+    club = get_object_or_404(Club, id=club_id, teacher=request.user)
+    enrollments = (
+        Enrollment.objects
+        .active()
+        .filter(club=club)
+        .select_related('child')
+        .order_by('child__surname', 'child__first_name', 'id')
+    )
+    page = Paginator(enrollments, ROSTER_PAGE_SIZE).get_page(
+        request.GET.get('page')
+    )
+    return render(request, 'club/club_roster.html', {
+        'club': club,
+        'page': page,
+    })
+
+
+@login_required
+@role_required('teacher')
+def club_attendance(request, club_id):
+    """
+    Show a club's sessions with links to their registers, and the
+    attendance rates of the club and each enrolled child. The rates are
+    read from running totals kept up to date when registers are saved.
+    """
+    club = get_object_or_404(Club, id=club_id, teacher=request.user)
+    sessions = (
+        ClubSession.objects
+        .filter(club=club, date__lte=date.today())
+        .annotate(marked=Exists(
+            Attendance.objects.filter(session=OuterRef('pk'))
+        ))
+        .order_by('-date', '-start_time')
+    )
+    page = Paginator(sessions, SESSIONS_PER_PAGE).get_page(
+        request.GET.get('page')
+    )
+    enrollments = (
+        Enrollment.objects
+        .active()
+        .filter(club=club)
+        .select_related('child')
+        .order_by('child__surname', 'child__first_name', 'id')
+    )
+    return render(request, 'club/club_attendance.html', {
+        'club': club,
+        'page': page,
+        'enrollments': enrollments,
+    })
+
+
+@login_required
+@role_required('teacher')
+def session_register(request, club_id, session_id):
+    """
+    Take or correct the register for one session in a single submit.
+    """
+    session = get_object_or_404(
+        ClubSession.objects.select_related('club'),
+        id=session_id, club_id=club_id, club__teacher=request.user
+    )
+    if session.date > date.today():
+        messages.error(
+            request, "The register opens on the day of the session."
+        )
+        return redirect('club:club_attendance', club_id=club_id)
+
+    enrollments = list(
+        Enrollment.objects
+        .active()
+        .filter(club_id=club_id)
+        .select_related('child')
+        .order_by('child__surname', 'child__first_name', 'id')
+    )
+    if request.method == 'POST':
+        form = RegisterForm(enrollments, request.POST)
+        if form.is_valid():
+            mark_register(session, form.cleaned_data['present'])
+            messages.success(
+                request, f"Register saved for {session.date:%d %B %Y}."
+            )
+            return redirect('club:club_attendance', club_id=club_id)
+    else:
+        present = Attendance.objects.filter(
+            session=session, present=True
+        ).values_list('enrollment_id', flat=True)
+        form = RegisterForm(enrollments, initial={'present': list(present)})
+
+    return render(request, 'club/session_register.html', {
+        'club': session.club,
+        'session': session,
+        'form': form,
+    })
+
+
+EXPORT_FORMATS = {
+    'csv': (roster_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (
+        roster_xlsx,
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    ),
+}
+
+
+@login_required
+@role_required('teacher')
+@require_safe
+def export_roster(request, club_id=None):
+    """
+    Download the roster of one of the teacher's clubs, or of all of them,
+    as CSV or XLSX. Rows are streamed straight from the database cursor,
+    so large rosters are never held in memory.
+    """
+    club = None
+    if club_id is not None:
+        club = get_object_or_404(Club, id=club_id, teacher=request.user)
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404("Unknown export format.")
+    render_rows, content_type = EXPORT_FORMATS[export_format]
+
+    response = streaming_response(
+        render_rows(roster_rows(request.user, club)),
+        content_type=content_type
+    )
+    filename = f'roster-{club.pk}' if club else 'roster-all-clubs'
+    response['Content-Disposition'] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    return response
+
+
 @login_required
 @role_required('teacher')
 def view_child_details(request, child_id):
     """
     Allow a teacher to view details of a child enrolled in their clubs.
+    Access is checked against the teacher's cached access index, so the
+    page costs one query for the child.
     """
-    # Ensure child is actively enrolled in one of the teacher's clubs
-    enrolled = Enrollment.objects.filter(
-        club__teacher=request.user,
-        child_id=child_id,
-        status="active"
-    ).exists()
-
-    if not enrolled:
+    if not can_view_child(request.user, child_id):
         messages.error(
             request,
             "You do not have permission to view this child's details."
@@ -264,3 +533,34 @@ def view_child_details(request, child_id):
     child = get_object_or_404(Child, id=child_id)
 
     return render(request, "club/view_child_details.html", {"child": child})
+
+
+@require_safe
+def calendar_feed(request, role, token):
+    """
+    Serve a parent's or teacher's sessions as a streamed iCalendar feed.
+    The signed token replaces a login. Clients polling an unchanged feed
+    get a 304 from one aggregate query, without the feed being built.
+    """
+    user = user_for_token(token, role) if role in FEED_ROLES else None
+    if user is None:
+        raise Http404("Calendar feed not found.")
+
+    etag, last_modified = feed_version(user)
+    last_modified = last_modified and last_modified.timestamp()
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    name = "My clubs" if role == 'teacher' else "My children's clubs"
+    response = streaming_response(
+        ical_lines(feed_sessions(user), request.get_host(), name),
+        content_type='text/calendar; charset=utf-8'
+    )
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = 'inline; filename="clubs.ics"'
+    return response
@@ -1,9 +1,53 @@
 from django.contrib import admin
-from .models import Enrollment
+from .models import Attendance, Enrollment, WaitlistEntry
+from .services import release_seat
 
 
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
+    """
+    Existing enrollments are cancelled with the action below, which goes
+    through release_seat so the freed seat reaches the waitlist; their
+    status, child and club cannot be edited directly.
+    """
     list_display = ('child', 'club', 'status', 'enrollment_date')
     list_filter = ('status', 'club')
     search_fields = ('child__name', 'club__title')
+    actions = ['cancel_enrollments']
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is None:
+            return ()
+        return ('child', 'club', 'status')
+
+    @admin.action(description='Cancel selected enrollments')
+    def cancel_enrollments(self, request, queryset):
+        cancelled = 0
+        for enrollment in queryset.active():
+            release_seat(enrollment)
+            cancelled += 1
+        self.message_user(request, f"Cancelled {cancelled} enrollment(s).")
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('child', 'club', 'position', 'created_at')
+    list_filter = ('club',)
+
+
+@admin.register(Attendance)
+class AttendanceAdmin(admin.ModelAdmin):
+    """
+    Registers are taken in the app so the attendance totals stay in
+    step; the admin only shows them. Rows go when their session or
+    enrollment does, which discounts them from the totals.
+    """
+    list_display = ('enrollment', 'session', 'present', 'marked_at')
+    list_filter = ('present', 'session__club')
+    readonly_fields = ('enrollment', 'session', 'present', 'marked_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,135 @@
+import time
+import uuid
+from functools import wraps
+from math import ceil
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.shortcuts import render
+
+TICKET_SALT = 'enrollment.admission'
+# Seconds a ticket stays usable once its slot has come round
+TICKET_GRACE = 60
+# Furthest ahead (in one-second windows) a ticket can be booked
+MAX_WAIT_WINDOWS = 900
+
+WINDOW_KEY = 'admission:window:{}'
+FRONTIER_KEY = 'admission:frontier'
+USED_KEY = 'admission:used:{}'
+
+
+def admission_rate():
+    """
+    Requests per second let through to the enrollment views.
+    """
+    return getattr(settings, 'ENROLLMENT_ADMISSION_RATE', 20)
+
+
+def reserve_slot(now):
+    """
+    Book the earliest one-second window with room left and return it.
+    Windows are counters in the cache; the frontier remembers the first
+    window that may still have room so late arrivals skip full ones.
+    """
+    rate = admission_rate()
+    window = max(int(now), cache.get(FRONTIER_KEY, 0))
+    for _ in range(MAX_WAIT_WINDOWS):
+        key = WINDOW_KEY.format(window)
+        cache.add(key, 0, timeout=MAX_WAIT_WINDOWS + TICKET_GRACE)
+        if cache.incr(key) <= rate:
+            return window
+        window += 1
+        cache.set(FRONTIER_KEY, window, timeout=MAX_WAIT_WINDOWS)
+    return window
+
+
+def issue_ticket(slot):
+    return signing.dumps(
+        {'slot': slot, 'nonce': uuid.uuid4().hex}, salt=TICKET_SALT
+    )
+
+
+def read_ticket(ticket):
+    """
+    Return the slot a ticket was booked for, or None if it is invalid.
+    """
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT)['slot']
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def redeem_ticket(ticket, now):
+    """
+    Accept a ticket whose slot has arrived, once only.
+    """
+    try:
+        data = signing.loads(ticket, salt=TICKET_SALT)
+    except signing.BadSignature:
+        return False
+    if not data['slot'] <= now <= data['slot'] + TICKET_GRACE:
+        return False
+    return cache.add(
+        USED_KEY.format(data['nonce']), True, timeout=TICKET_GRACE + 1
+    )
+
+
+def admit(request):
+    """
+    Decide whether a request may reach the enrollment view now. Returns
+    None to let it through, or the waiting room response for a later
+    slot. Neither the check nor the waiting room touch the database.
+    """
+    if request.method != 'POST':
+        return None
+
+    now = time.time()
+    ticket = request.POST.get('admission_ticket')
+    if ticket and redeem_ticket(ticket, now):
+        return None
+
+    slot = reserve_slot(now)
+    if slot <= now:
+        return None
+
+    resubmit = [
+        (name, value)
+        for name, value in request.POST.items()
+        if name not in ('csrfmiddlewaretoken', 'admission_ticket')
+    ]
+    wait = ceil(slot - now)
+    response = render(request, 'enrollment/waiting_room.html', {
+        'ticket': issue_ticket(slot),
+        'wait': wait,
+        'resubmit': resubmit,
+    })
+    response['Retry-After'] = str(wait)
+    return response
+
+
+def admission_required(view_func):
+    """
+    Rate-limit POSTs to an enrollment view. Requests over the configured
+    rate get a ticket for a later slot and a waiting room page that polls
+    `admission_status` and re-submits the form when the slot arrives.
+    Works on sync and async views alike.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async_view(request, *args, **kwargs):
+            # The cache and the template renderer are sync-only
+            response = await sync_to_async(admit)(request)
+            if response is not None:
+                return response
+            return await view_func(request, *args, **kwargs)
+        return _wrapped_async_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        response = admit(request)
+        if response is not None:
+            return response
+        return view_func(request, *args, **kwargs)
+    return _wrapped_view
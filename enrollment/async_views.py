@@ -0,0 +1,134 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import render, redirect
+from user.decorators import role_required
+from user.idempotency import idempotent
+from .admission import admission_required
+from .forms import EnrollmentForm
+from .models import Enrollment
+from . import services
+from .validation import enrolled_clubs_for, validate_enrollment
+from club.models import Club
+from club.seats import parse_club_ids, seat_events
+
+# Views for the ASGI deployment (see Procfile.asgi). Lookups use the
+# async ORM; seat reservation and template rendering run in a thread
+# because transactions and template rendering are sync-only.
+
+
+def asgi_only(view_func):
+    """
+    Serve an async view only under the ASGI deployment. Under WSGI each
+    would tie up a worker, and the sync views already cover them.
+    """
+    @wraps(view_func)
+    async def _wrapped_view(request, *args, **kwargs):
+        if not settings.ASGI_DEPLOYMENT:
+            raise Http404("This page needs the ASGI deployment.")
+        return await view_func(request, *args, **kwargs)
+    return _wrapped_view
+
+
+@role_required('parent')
+@asgi_only
+@admission_required
+@idempotent
+async def create_enrollment_with_club_async(request, club_id):
+    """
+    Async version of create_enrollment_with_club.
+    Errors are flashed and the parent is sent back to the form.
+    """
+    try:
+        club = await Club.objects.aget(id=club_id)
+    except Club.DoesNotExist:
+        raise Http404("No club matches the given query.")
+
+    if request.method != 'POST':
+        form = EnrollmentForm(initial={'club': club})
+        form.fields['child'].queryset = request.user.children.all()
+        return await sync_to_async(render)(
+            request,
+            'enrollment/create_enrollment.html',
+            {'form': form}
+        )
+
+    child_id = request.POST.get('child', '')
+    child = None
+    if child_id.isdigit():
+        child = await request.user.children.filter(pk=child_id).afirst()
+    if child is None:
+        messages.error(request, "Please select one of your children.")
+        return redirect(
+            'enrollment:create_enrollment_with_club_async', club_id=club.id
+            )
+
+    enrolled_clubs = [
+        enrolled async for enrolled in enrolled_clubs_for(child)
+    ]
+    check = validate_enrollment(child, club, enrolled_clubs=enrolled_clubs)
+    if check.is_valid:
+        try:
+            await sync_to_async(services.reserve_seat)(child, club)
+        except ValidationError as error:
+            check.add('reservation', error.messages[0])
+
+    if not check.is_valid:
+        for message in check.messages:
+            messages.error(request, message)
+        return redirect(
+            'enrollment:create_enrollment_with_club_async', club_id=club.id
+            )
+
+    messages.success(
+        request,
+        f"{child.first_name} successfully enrolled in {club.name}!"
+        )
+    return redirect('user:parent_dashboard')
+
+
+@role_required('parent')
+@asgi_only
+async def cancel_enrollment_async(request, enrollment_id):
+    """
+    Async version of cancel_enrollment. Only POST cancels.
+    """
+    enrollment = await (
+        Enrollment.objects
+        .active()
+        .select_related('club')
+        .filter(id=enrollment_id, child__parent=request.user)
+        .afirst()
+    )
+    if enrollment is None:
+        raise Http404("No enrollment matches the given query.")
+
+    if request.method == 'POST':
+        await sync_to_async(services.release_seat)(enrollment)
+        messages.success(request, "Enrollment cancelled successfully!")
+
+    return redirect('enrollment:cancel_enrollment_page')
+
+
+@role_required('parent')
+@asgi_only
+async def seat_stream(request):
+    """
+    Stream live remaining-seat counts for the clubs listed in ?clubs=
+    as Server-Sent Events, so parents watch one connection instead of
+    reloading pages. Under WSGI the stream would tie up a worker for
+    its whole lifetime, so it is only served by the ASGI deployment.
+    """
+    club_ids = parse_club_ids(request.GET.get('clubs', ''))
+
+    response = StreamingHttpResponse(
+        seat_events(club_ids), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,7 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from datetime import date
 from .models import Enrollment
+from .services import reserve_seat
+from .validation import validate_enrollment
 
 
 class EnrollmentForm(forms.ModelForm):
@@ -15,67 +16,27 @@ class EnrollmentForm(forms.ModelForm):
         club = cleaned_data.get('club')
 
         if child and club:
-            # Calculate age
-            today = date.today()
-            age = (
-                today.year - child.date_of_birth.year
-                - (
-                    (today.month, today.day)
-                    < (child.date_of_birth.month, child.date_of_birth.day)
-                )
-            )
-
-            # Too young
-            if club.min_age is not None and age < club.min_age:
-                raise ValidationError(
-                    (
-                        f"{child.first_name} {child.surname} is too young "
-                        f"for {club.name}. Minimum age is {club.min_age}."
-                    )
-                )
-
-            # Too old
-            if club.max_age is not None and age > club.max_age:
-                raise ValidationError(
-                    (
-                        f"{child.first_name} {child.surname} is too old "
-                        f"for {club.name}. Maximum age is {club.max_age}."
-                    )
-                )
-
-        # Already enrolled
-        if Enrollment.objects.filter(child=child, club=club).exists():
-            raise ValidationError(
-                (
-                    f"{child.first_name} {child.surname} is already "
-                    f"enrolled in {club.name}."
-                )
-            )
-
-        # Check if club is full
-        current_enrollments = Enrollment.objects.filter(club=club).count()
-        if club.capacity is not None and current_enrollments >= club.capacity:
-            raise ValidationError(
-                (
-                    f"{club.name} has reached its maximum capacity of "
-                    f"{club.capacity} children."
-                )
-            )
-
-        # Time conflict check
-        conflicting_enrollments = Enrollment.objects.filter(
-            child=child,
-            club__end_date__gte=club.start_date,  # overlap in dates
-            club__start_date__lte=club.end_date
-        ).exclude(club=club)
-
-        for e in conflicting_enrollments:
-            if (club.start_time < e.club.end_time
-                    and club.end_time > e.club.start_time):
-                raise ValidationError(
-                    f"{child.first_name} {child.surname} "
-                    "is already enrolled in "
-                    f"{e.club.name} which overlaps with {club.name}."
-                )
+            self.enrollment_check = validate_enrollment(child, club)
+            if not self.enrollment_check.is_valid:
+                raise ValidationError(self.enrollment_check.messages)
 
         return cleaned_data
+
+    def validate_unique(self):
+        """
+        Skip the model's unique constraint query: the duplicate check is
+        part of validate_enrollment and reserve_seat guards the insert.
+        """
+
+    def save(self, commit=True):
+        """
+        Save the enrollment by reserving a seat in the club, so the
+        capacity check and the insert happen in one transaction.
+        """
+        if not commit:
+            return super().save(commit=False)
+        self.instance = reserve_seat(
+            self.cleaned_data['child'],
+            self.cleaned_data['club']
+        )
+        return self.instance
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('club', '0005_club_seat_counters'),
+        ('child', '0003_rename_name_child_first_name_child_surname'),
+        ('enrollment', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='child.child')),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='club.club')),
+            ],
+            options={
+                'verbose_name_plural': 'Waitlist entries',
+                'ordering': ['club', 'position'],
+                'indexes': [models.Index(fields=['club', 'position'], name='waitlist_club_position_idx')],
+                'unique_together': {('child', 'club')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-18 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enrollment', '0002_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='enrollment',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['club', 'status'], name='enrollment_club_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['child', 'status'], name='enrollment_child_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='enrollment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'active')), fields=('child', 'club'), name='unique_active_enrollment'),
+        ),
+    ]
@@ -1,6 +1,14 @@
 from django.db import models
 from child.models import Child
-from club.models import Club
+from club.models import Club, ClubSession
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    def active(self):
+        """
+        Enrollments that hold a seat; cancelled rows are kept as history.
+        """
+        return self.filter(status='active')
 
 
 class Enrollment(models.Model):
@@ -28,14 +36,119 @@ class Enrollment(models.Model):
         default='active'
     )
 
+    # Running attendance totals, maintained by the register service
+    sessions_marked = models.PositiveIntegerField(default=0)
+    sessions_attended = models.PositiveIntegerField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EnrollmentQuerySet.as_manager()
+
     class Meta:
-        unique_together = ('child', 'club')
+        constraints = [
+            # A child may re-enroll after cancelling, so only one
+            # active row per child and club is enforced
+            models.UniqueConstraint(
+                fields=['child', 'club'],
+                condition=models.Q(status='active'),
+                name='unique_active_enrollment',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['club', 'status'],
+                name='enrollment_club_status_idx'
+            ),
+            models.Index(
+                fields=['child', 'status'],
+                name='enrollment_child_status_idx'
+            ),
+        ]
+
+    @property
+    def attendance_rate(self):
+        """
+        Percentage of marked sessions the child attended, or None if no
+        register has been taken yet.
+        """
+        if not self.sessions_marked:
+            return None
+        return round(self.sessions_attended * 100 / self.sessions_marked)
 
     def __str__(self):
         return (
             f"{self.child.first_name} {self.child.surname} "
             f"-> {self.club.name}"
         )
+
+
+class WaitlistEntry(models.Model):
+    """
+    A child queued for a seat in a full club. Entries are served in
+    order of `position`, which is kept dense (1, 2, 3...) so a parent's
+    place in the queue can be read straight off the row.
+    """
+    child = models.ForeignKey(
+        Child,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    club = models.ForeignKey(
+        Club,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries'
+    )
+    position = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('child', 'club')
+        ordering = ['club', 'position']
+        indexes = [
+            models.Index(
+                fields=['club', 'position'],
+                name='waitlist_club_position_idx'
+            ),
+        ]
+        verbose_name_plural = "Waitlist entries"
+
+    def __str__(self):
+        return (
+            f"{self.child.first_name} {self.child.surname} "
+            f"-> {self.club.name} (#{self.position})"
+        )
+
+
+class Attendance(models.Model):
+    """
+    Whether a child turned up to one session of a club they are
+    enrolled in. Rows are written a whole register at a time by
+    `enrollment.services.mark_register`, which also moves the totals
+    kept on the enrollment and club.
+    """
+    enrollment = models.ForeignKey(
+        Enrollment,
+        on_delete=models.CASCADE,
+        related_name='attendance'
+    )
+    session = models.ForeignKey(
+        ClubSession,
+        on_delete=models.CASCADE,
+        related_name='attendance'
+    )
+    present = models.BooleanField(default=False)
+    marked_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'enrollment'],
+                name='unique_session_attendance',
+            ),
+        ]
+        verbose_name_plural = "Attendance"
+
+    def __str__(self):
+        state = 'present' if self.present else 'absent'
+        return f"{self.enrollment} on {self.session.date}: {state}"
@@ -0,0 +1,315 @@
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from club.dashboard import (
+    drop_club_teacher_caches, drop_teacher_caches
+)
+from club.models import Club
+from club.seats import notify_seat_change
+from .models import Attendance, Enrollment, WaitlistEntry
+from .summary import drop_child_summaries
+from .validation import eligibility_matrix
+
+
+def reserve_seat(child, club):
+    """
+    Claim a seat in a club for a child in a single transaction.
+    The club row is locked while its seat counter is checked and the
+    enrollment is inserted, so concurrent requests cannot overbook it.
+    """
+    try:
+        with transaction.atomic():
+            locked_club = Club.objects.select_for_update().get(pk=club.pk)
+
+            # The seat counter is kept in sync by enrollment signals
+            if locked_club.seats_remaining <= 0:
+                raise ValidationError(
+                    f"{locked_club.name} has reached its maximum capacity "
+                    f"of {locked_club.capacity} children."
+                )
+
+            return Enrollment.objects.create(child=child, club=locked_club)
+    except IntegrityError:
+        # unique_active_enrollment caught a concurrent duplicate
+        raise ValidationError(
+            f"{child.first_name} {child.surname} is already "
+            f"enrolled in {club.name}."
+        )
+
+
+def release_seat(enrollment):
+    """
+    Cancel an enrollment and hand the freed seat to the waitlist,
+    all in one transaction. The row is kept with a cancelled status.
+    """
+    with transaction.atomic():
+        cancelled = (
+            Enrollment.objects
+            .active()
+            .filter(pk=enrollment.pk)
+            .update(status='cancelled', updated_at=timezone.now())
+        )
+        if not cancelled:
+            # Already cancelled by an earlier request
+            return []
+        enrollment.status = 'cancelled'
+        Club.objects.filter(pk=enrollment.club_id).adjust_enrollment_count(-1)
+        notify_seat_change(enrollment.club_id)
+        drop_club_teacher_caches(enrollment.club_id)
+        drop_child_summaries(enrollment.child_id)
+        return promote_waitlist(enrollment.club)
+
+
+def join_waitlist(child, club):
+    """
+    Add a child to the back of a club's waitlist and return the entry.
+    """
+    try:
+        with transaction.atomic():
+            # Lock the club so concurrent joins get distinct positions
+            locked_club = Club.objects.select_for_update().get(pk=club.pk)
+            last = (
+                WaitlistEntry.objects
+                .filter(club=locked_club)
+                .aggregate(last=Max('position'))['last']
+            )
+            return WaitlistEntry.objects.create(
+                child=child,
+                club=locked_club,
+                position=(last or 0) + 1,
+            )
+    except IntegrityError:
+        raise ValidationError(
+            f"{child.first_name} {child.surname} is already on the "
+            f"waitlist for {club.name}."
+        )
+
+
+def leave_waitlist(entry):
+    """
+    Remove an entry and move everyone behind it up one place.
+    """
+    with transaction.atomic():
+        # Lock the club so positions are not shifted under a promotion
+        Club.objects.select_for_update().get(pk=entry.club_id)
+        # Read the place again: the entry may have moved since it loaded
+        position = WaitlistEntry.objects.filter(pk=entry.pk).values_list(
+            'position', flat=True
+        ).first()
+        if position is None:
+            return
+        entry.delete()
+        WaitlistEntry.objects.filter(
+            club_id=entry.club_id,
+            position__gt=position
+        ).update(position=F('position') - 1)
+
+
+def renumber_waitlist(club_id):
+    """
+    Number a club's waitlist 1, 2, 3... again in queue order once
+    entries have left it. Call inside a transaction holding the club
+    lock; only entries whose place changed are written.
+    """
+    moved = []
+    for entry in WaitlistEntry.objects.filter(club_id=club_id).annotate(
+        place=Window(
+            RowNumber(),
+            order_by=[F('position').asc(), F('pk').asc()],
+        )
+    ).only('pk', 'position'):
+        if entry.position != entry.place:
+            entry.position = entry.place
+            moved.append(entry)
+    WaitlistEntry.objects.bulk_update(moved, ['position'], batch_size=500)
+
+
+def after_removal(club_id, promote=False):
+    """
+    Close the gaps in a club's waitlist left by deleted entries and, if
+    a seat was freed, promote from its front. Run once a delete that
+    skipped the services, such as a cascade from a child or the admin,
+    has committed; the club may have been deleted with it.
+    """
+    with transaction.atomic():
+        club = Club.objects.select_for_update().filter(pk=club_id).first()
+        if club is None:
+            return
+        if promote:
+            promote_waitlist(club)
+        else:
+            renumber_waitlist(club_id)
+
+
+def promote_waitlist(club):
+    """
+    Fill a club's free seats from the front of its waitlist in one
+    transaction, skipping and dropping children who no longer pass the
+    enrollment rules. Returns the new enrollments.
+    """
+    with transaction.atomic():
+        locked_club = Club.objects.select_for_update().get(pk=club.pk)
+        if locked_club.seats_remaining <= 0:
+            return []
+
+        # Children who got a seat some other way no longer need theirs
+        WaitlistEntry.objects.filter(
+            club=locked_club,
+            child__enrollments__club=locked_club,
+            child__enrollments__status='active',
+        ).delete()
+
+        # Ages and other clubs may have changed while children waited,
+        # so the rules run again; children who no longer qualify leave
+        # the queue. Entries are checked a batch at a time, only as far
+        # back as needed to fill the seats.
+        seats = locked_club.seats_remaining
+        queue = list(
+            WaitlistEntry.objects
+            .filter(club=locked_club)
+            .select_related('child')
+            .order_by('position', 'pk')
+        )
+        promoted, dropped = [], []
+        while len(promoted) < seats and queue:
+            batch = queue[:seats - len(promoted)]
+            del queue[:len(batch)]
+            matrix = eligibility_matrix(
+                [entry.child for entry in batch], [locked_club]
+            )
+            for entry in batch:
+                if matrix[entry.child_id, locked_club.pk].is_valid:
+                    promoted.append(entry)
+                else:
+                    dropped.append(entry)
+        WaitlistEntry.objects.filter(
+            pk__in=[entry.pk for entry in promoted + dropped]
+        ).delete()
+        # Number what is left afresh, closing the gaps left by the
+        # promoted, dropped and stale entries
+        renumber_waitlist(locked_club.pk)
+        if not promoted:
+            return []
+
+        enrollments = Enrollment.objects.bulk_create(
+            Enrollment(child_id=entry.child_id, club=locked_club)
+            for entry in promoted
+        )
+        # bulk_create skips the seat counter signals
+        Club.objects.filter(pk=locked_club.pk).adjust_enrollment_count(
+            len(enrollments)
+        )
+        notify_seat_change(locked_club.pk)
+        drop_teacher_caches(locked_club.teacher_id)
+        drop_child_summaries(*(entry.child_id for entry in promoted))
+        return enrollments
+
+
+def mark_register(session, present_ids):
+    """
+    Record the register for one session of a club. Active enrollments
+    whose ids are in `present_ids` are marked present and all others
+    absent. Rows are written with bulk_create and bulk_update in one
+    transaction, and the attendance totals on the enrollments and club
+    move by the difference, so rates are never recounted.
+    Returns the number of rows (created, updated).
+    """
+    present_ids = set(present_ids)
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Lock the club so two saves of one register cannot both count
+        Club.objects.select_for_update().get(pk=session.club_id)
+        marked = {
+            row.enrollment_id: row
+            for row in Attendance.objects.filter(session=session)
+        }
+
+        created, updated = [], []
+        # (marked, attended) change -> enrollments it applies to
+        changes = {}
+        for pk in Enrollment.objects.active().filter(
+            club_id=session.club_id
+        ).values_list('pk', flat=True):
+            present = pk in present_ids
+            row = marked.get(pk)
+            if row is None:
+                created.append(Attendance(
+                    enrollment_id=pk, session=session,
+                    present=present, marked_at=now
+                ))
+                change = (1, int(present))
+            elif row.present != present:
+                row.present = present
+                row.marked_at = now
+                updated.append(row)
+                change = (0, 1 if present else -1)
+            else:
+                continue
+            changes.setdefault(change, []).append(pk)
+
+        Attendance.objects.bulk_create(created, batch_size=500)
+        Attendance.objects.bulk_update(
+            updated, ['present', 'marked_at'], batch_size=500
+        )
+
+        totals = Counter()
+        for (marked_delta, attended_delta), pks in changes.items():
+            Enrollment.objects.filter(pk__in=pks).update(
+                sessions_marked=F('sessions_marked') + marked_delta,
+                sessions_attended=F('sessions_attended') + attended_delta,
+            )
+            totals['marked'] += marked_delta * len(pks)
+            totals['present'] += attended_delta * len(pks)
+        if totals:
+            Club.objects.filter(pk=session.club_id).update(
+                attendance_marked=F('attendance_marked') + totals['marked'],
+                attendance_present=(
+                    F('attendance_present') + totals['present']
+                ),
+            )
+
+    return len(created), len(updated)
+
+
+def discount_attendance(club_id, session_ids):
+    """
+    Take the registers of some sessions off the attendance totals of
+    their enrollments and club. Call in the transaction that deletes the
+    sessions, whose Attendance rows go with them by cascade.
+    """
+    # Lock the club so a register saved meanwhile is not lost
+    Club.objects.select_for_update().get(pk=club_id)
+    # (marked, attended) taken off -> enrollments it applies to
+    changes = {}
+    for row in (
+        Attendance.objects
+        .filter(session_id__in=session_ids)
+        .values('enrollment_id')
+        .annotate(
+            marked=Count('pk'),
+            attended=Count('pk', filter=Q(present=True)),
+        )
+    ):
+        changes.setdefault(
+            (row['marked'], row['attended']), []
+        ).append(row['enrollment_id'])
+
+    totals = Counter()
+    for (marked, attended), pks in changes.items():
+        Enrollment.objects.filter(pk__in=pks).update(
+            sessions_marked=F('sessions_marked') - marked,
+            sessions_attended=F('sessions_attended') - attended,
+        )
+        totals['marked'] += marked * len(pks)
+        totals['present'] += attended * len(pks)
+    if totals:
+        Club.objects.filter(pk=club_id).update(
+            attendance_marked=F('attendance_marked') - totals['marked'],
+            attendance_present=F('attendance_present') - totals['present'],
+        )
@@ -0,0 +1,122 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from child.models import Child
+from club.dashboard import drop_club_teacher_caches
+from club.models import Club
+from club.seats import notify_seat_change
+from .models import Enrollment, WaitlistEntry
+from .services import after_removal, promote_waitlist
+from .summary import drop_club_summaries, drop_child_summaries
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_stored_status(sender, instance, **kwargs):
+    """
+    Note the status in the database before an existing enrollment is
+    saved, so a change of status can move the seat counters.
+    """
+    instance._stored_status = None
+    if not instance._state.adding:
+        instance._stored_status = (
+            Enrollment.objects
+            .filter(pk=instance.pk)
+            .values_list('status', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Enrollment)
+def claim_club_seat(sender, instance, created, **kwargs):
+    """
+    Count a new active enrollment against its club's seats, and move the
+    count when a save changes the status of an existing one. A seat
+    freed that way goes to the waitlist, as with release_seat.
+    """
+    was_active = not created and instance._stored_status == 'active'
+    is_active = instance.status == 'active'
+    if was_active == is_active:
+        return
+
+    Club.objects.filter(pk=instance.club_id).adjust_enrollment_count(
+        1 if is_active else -1
+    )
+    notify_seat_change(instance.club_id)
+    drop_club_teacher_caches(instance.club_id)
+    if was_active:
+        promote_waitlist(instance.club)
+
+
+@receiver(post_delete, sender=Enrollment)
+def release_club_seat(sender, instance, **kwargs):
+    """
+    Give the seat of a deleted active enrollment back to its club.
+    """
+    if instance.status == 'active':
+        Club.objects.filter(pk=instance.club_id).adjust_enrollment_count(-1)
+        notify_seat_change(instance.club_id)
+        drop_club_teacher_caches(instance.club_id)
+        # The freed seat goes to the head of the queue, as with
+        # release_seat, once the delete (and any cascade) has committed
+        transaction.on_commit(
+            partial(after_removal, instance.club_id, promote=True)
+        )
+
+
+@receiver(pre_delete, sender=Enrollment)
+def discount_enrollment_attendance(sender, instance, **kwargs):
+    """
+    Take a deleted enrollment's registers off its club's attendance
+    totals; its Attendance rows go with it by cascade.
+    """
+    if instance.sessions_marked:
+        Club.objects.filter(pk=instance.club_id).update(
+            attendance_marked=(
+                F('attendance_marked') - instance.sessions_marked
+            ),
+            attendance_present=(
+                F('attendance_present') - instance.sessions_attended
+            ),
+        )
+
+
+@receiver(post_delete, sender=WaitlistEntry)
+def close_waitlist_gap(sender, instance, **kwargs):
+    """
+    Keep the club's waitlist positions dense when an entry is deleted
+    outside leave_waitlist, e.g. along with its child.
+    """
+    transaction.on_commit(partial(after_removal, instance.club_id))
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def drop_enrollment_summary(sender, instance, **kwargs):
+    """
+    The parent's dashboard summary lists the child's enrollments.
+    """
+    drop_child_summaries(instance.child_id)
+
+
+@receiver(post_save, sender=Child)
+@receiver(post_delete, sender=Child)
+def drop_child_summary(sender, instance, **kwargs):
+    """
+    A child added, renamed or removed changes the parent's summary.
+    """
+    drop_child_summaries(instance.pk, parent_id=instance.parent_id)
+
+
+@receiver(post_save, sender=Club)
+def drop_club_parent_summaries(sender, instance, created, **kwargs):
+    """
+    A renamed club shows its old name in the summaries of its parents.
+    """
+    if not created:
+        drop_club_summaries(instance.pk)
@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from school_clubs_events.caching import cache_timeout
+
+from child.models import Child
+from club.models import ClubSession
+from .models import Enrollment
+
+SUMMARY_KEY = 'parent_summary:{}'
+SUMMARY_TIMEOUT = 60 * 60 * 24
+UPCOMING_DAYS = 7
+# Sessions listed under each child
+NEXT_SESSIONS = 5
+
+
+def summary_key(parent_id):
+    return SUMMARY_KEY.format(parent_id)
+
+
+def child_entries(children, today):
+    """
+    Map each child in a queryset to its dashboard entry: name, active
+    enrollments and next sessions. Three queries whatever the number of
+    children, so the same code builds one child or a whole family.
+    """
+    entries = {
+        child['pk']: dict(child, enrollments=[], sessions=[])
+        for child in children.order_by('first_name', 'pk').values(
+            'pk', 'first_name', 'surname'
+        )
+    }
+    enrollments = list(
+        Enrollment.objects
+        .active()
+        .filter(child_id__in=list(entries))
+        .order_by('club__name')
+        .values('pk', 'child_id', 'club_id', 'club__name')
+    )
+    sessions = {}
+    for session in (
+        ClubSession.objects
+        .filter(club_id__in={row['club_id'] for row in enrollments})
+        .between(today, today + timedelta(days=UPCOMING_DAYS - 1))
+        .values('club_id', 'date', 'start_time', 'end_time')
+    ):
+        sessions.setdefault(session['club_id'], []).append(session)
+
+    for enrollment in enrollments:
+        entry = entries[enrollment['child_id']]
+        entry['enrollments'].append(enrollment)
+        entry['sessions'].extend(
+            dict(session, club__name=enrollment['club__name'])
+            for session in sessions.get(enrollment['club_id'], [])
+        )
+    for entry in entries.values():
+        entry['sessions'].sort(
+            key=lambda session: (session['date'], session['start_time'])
+        )
+        del entry['sessions'][NEXT_SESSIONS:]
+    return entries
+
+
+def parent_summary(parent):
+    """
+    Return a parent's dashboard summary with one cache read. It is built
+    in full on a miss or on the first visit of a new day, when the next
+    sessions move on; changes delete it, so the next visit rebuilds it.
+    """
+    key = summary_key(parent.pk)
+    today = date.today()
+    summary = cache.get(key)
+    if summary is None or summary['built_on'] != today:
+        summary = {
+            'built_on': today,
+            'children': child_entries(parent.children.all(), today),
+        }
+        cache.set(key, summary, timeout=cache_timeout(SUMMARY_TIMEOUT))
+    return summary
+
+
+def drop_child_summaries(*child_ids, parent_id=None):
+    """
+    Forget the summary of the parent of some children once the current
+    transaction commits. The parent is looked up unless given, which it
+    must be for a deleted child. The summary is shared by all of a
+    parent's children, so it is deleted rather than patched: two workers
+    patching different children could each store over the other's change.
+    """
+    if child_ids:
+        transaction.on_commit(
+            partial(_drop_for_children, set(child_ids), parent_id)
+        )
+
+
+def _drop_for_children(child_ids, parent_id):
+    if parent_id is None:
+        parent_ids = (
+            Child.objects
+            .filter(pk__in=child_ids)
+            .values_list('parent_id', flat=True)
+            .distinct()
+        )
+    else:
+        parent_ids = [parent_id]
+    cache.delete_many([summary_key(pk) for pk in parent_ids])
+
+
+def drop_club_summaries(club_id):
+    """
+    Forget the summaries of every parent with a child in a club whose
+    name or sessions changed, once the current transaction commits.
+    """
+    transaction.on_commit(partial(_drop_for_club, club_id))
+
+
+def _drop_for_club(club_id):
+    parent_ids = (
+        Enrollment.objects
+        .active()
+        .filter(club_id=club_id)
+        .values_list('child__parent_id', flat=True)
+        .distinct()
+    )
+    cache.delete_many([summary_key(pk) for pk in parent_ids])
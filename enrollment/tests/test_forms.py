@@ -150,3 +150,61 @@ class EnrollmentFormTest(TestCase):
                   )
         self.assertFalse(form.is_valid())
         self.assertIn('overlaps with', str(form.errors))
+
+    def test_weekly_clubs_on_different_weekdays(self):
+        """
+        Weekly clubs at the same time on different weekdays
+        should not clash.
+        """
+        start = date.today() + timedelta(days=1)
+        weekly = Club.objects.create(
+            teacher=self.teacher,
+            name='Weekly Club',
+            capacity=5,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=start,
+            end_date=start + timedelta(weeks=4),
+            frequency='weekly'
+        )
+        other_weekday = Club.objects.create(
+            teacher=self.teacher,
+            name='Other Weekday Club',
+            capacity=5,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=start + timedelta(days=2),
+            end_date=start + timedelta(weeks=4),
+            frequency='weekly'
+        )
+        Enrollment.objects.create(child=self.child, club=weekly)
+
+        form = EnrollmentForm(
+            data={'child': self.child.id,
+                  'club': other_weekday.id}
+                  )
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_daily_club_clashes_with_later_session(self):
+        """
+        A daily club should clash with a one-off club on any of its days.
+        """
+        start = date.today() + timedelta(days=1)
+        daily = Club.objects.create(
+            teacher=self.teacher,
+            name='Daily Club',
+            capacity=5,
+            start_time=time(15, 30),
+            end_time=time(16, 30),
+            start_date=start - timedelta(days=10),
+            end_date=start + timedelta(days=10),
+            frequency='daily'
+        )
+        Enrollment.objects.create(child=self.child, club=daily)
+
+        form = EnrollmentForm(
+            data={'child': self.child.id,
+                  'club': self.club.id}
+                  )
+        self.assertFalse(form.is_valid())
+        self.assertIn('Daily Club which overlaps with', str(form.errors))
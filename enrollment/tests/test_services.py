@@ -0,0 +1,474 @@
+from django.test import TestCase
+from django.core.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from datetime import date, time, timedelta
+from enrollment.models import Attendance, Enrollment, WaitlistEntry
+from enrollment.services import (
+    join_waitlist,
+    leave_waitlist,
+    mark_register,
+    promote_waitlist,
+    release_seat,
+    reserve_seat,
+)
+from enrollment.validation import eligibility_matrix
+from child.models import Child
+from club.models import Club, ClubSession
+from club.services import sync_sessions
+
+User = get_user_model()
+
+
+class SeatServiceTestBase(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.child = Child.objects.create(
+            first_name='Child',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.other_child = Child.objects.create(
+            first_name='Child',
+            surname='Two',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            club_or_event='club',
+            description='Fun chess',
+            min_age=6,
+            max_age=12,
+            capacity=1,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=1),
+            frequency='one-off'
+        )
+
+
+class ReserveSeatTest(SeatServiceTestBase):
+    def test_reserve_seat_creates_enrollment(self):
+        """
+        Should create an enrollment when the club has a free seat.
+        """
+        enrollment = reserve_seat(self.child, self.club)
+        self.assertEqual(enrollment.child, self.child)
+        self.assertEqual(Enrollment.objects.filter(club=self.club).count(), 1)
+
+    def test_reserve_seat_when_full(self):
+        """
+        Should refuse the seat once the club has reached capacity.
+        """
+        reserve_seat(self.child, self.club)
+        with self.assertRaises(ValidationError):
+            reserve_seat(self.other_child, self.club)
+        self.assertEqual(Enrollment.objects.filter(club=self.club).count(), 1)
+
+    def test_reserve_seat_duplicate(self):
+        """
+        Should turn a duplicate enrollment into a validation error.
+        """
+        self.club.capacity = 5
+        self.club.save()
+        reserve_seat(self.child, self.club)
+        with self.assertRaisesMessage(ValidationError, 'already enrolled'):
+            reserve_seat(self.child, self.club)
+
+    def test_reenroll_after_cancellation(self):
+        """
+        A cancelled enrollment is kept as history and does not stop
+        the child from enrolling again.
+        """
+        enrollment = reserve_seat(self.child, self.club)
+        release_seat(enrollment)
+        reserve_seat(self.child, self.club)
+        self.assertEqual(
+            list(
+                Enrollment.objects
+                .filter(child=self.child)
+                .order_by('pk')
+                .values_list('status', flat=True)
+            ),
+            ['cancelled', 'active']
+        )
+
+
+class WaitlistTest(SeatServiceTestBase):
+    def test_join_waitlist_positions(self):
+        """
+        Children joining a waitlist should get consecutive positions.
+        """
+        first = join_waitlist(self.child, self.club)
+        second = join_waitlist(self.other_child, self.club)
+        self.assertEqual((first.position, second.position), (1, 2))
+
+    def test_leave_waitlist_moves_queue_up(self):
+        """
+        Leaving the waitlist should move everyone behind up one place.
+        """
+        first = join_waitlist(self.child, self.club)
+        second = join_waitlist(self.other_child, self.club)
+        leave_waitlist(first)
+        second.refresh_from_db()
+        self.assertEqual(second.position, 1)
+
+    def test_cancellation_promotes_first_in_queue(self):
+        """
+        Cancelling an enrollment should give the seat to the
+        first waitlisted child.
+        """
+        enrollment = reserve_seat(self.child, self.club)
+        join_waitlist(self.other_child, self.club)
+
+        promoted = release_seat(enrollment)
+
+        self.assertEqual(
+            [enrollment.child_id for enrollment in promoted],
+            [self.other_child.id]
+        )
+        self.assertFalse(WaitlistEntry.objects.exists())
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.active_enrollment_count, 1)
+        self.assertEqual(self.club.seats_remaining, 0)
+
+    def test_saved_cancellation_frees_seat(self):
+        """
+        Cancelling by saving the status should free the seat and
+        promote the waitlist just as release_seat does.
+        """
+        enrollment = reserve_seat(self.child, self.club)
+        join_waitlist(self.other_child, self.club)
+
+        enrollment.status = 'cancelled'
+        enrollment.save()
+
+        self.assertTrue(
+            Enrollment.objects.active().filter(child=self.other_child).exists()
+        )
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.active_enrollment_count, 1)
+        self.assertEqual(self.club.seats_remaining, 0)
+
+        # Saving again without a change leaves the counters alone
+        enrollment.save()
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.active_enrollment_count, 1)
+
+    def test_deleting_an_enrolled_child_promotes_the_queue(self):
+        """
+        A seat freed by deleting a child should go to the head of the
+        waitlist, and the queue should stay numbered from 1.
+        """
+        third_child = Child.objects.create(
+            first_name='Child',
+            surname='Three',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        reserve_seat(self.child, self.club)
+        join_waitlist(self.other_child, self.club)
+        join_waitlist(third_child, self.club)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.delete()
+
+        self.assertTrue(
+            Enrollment.objects.active().filter(child=self.other_child).exists()
+        )
+        self.assertEqual(
+            WaitlistEntry.objects.get(child=third_child).position, 1
+        )
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.seats_remaining, 0)
+
+    def test_deleting_a_queued_child_closes_the_gap(self):
+        """
+        Deleting a child on the waitlist should move those behind up.
+        """
+        third_child = Child.objects.create(
+            first_name='Child',
+            surname='Three',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        reserve_seat(self.child, self.club)
+        join_waitlist(self.other_child, self.club)
+        join_waitlist(third_child, self.club)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_child.delete()
+
+        self.assertEqual(
+            WaitlistEntry.objects.get(child=third_child).position, 1
+        )
+
+    def test_promotion_skips_children_who_no_longer_qualify(self):
+        """
+        A queued child who has since joined a clashing club should be
+        dropped from the queue and the seat go to the next child.
+        """
+        third_child = Child.objects.create(
+            first_name='Child',
+            surname='Three',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        clashing = Club.objects.create(
+            teacher=self.teacher,
+            name='Drama Club',
+            capacity=5,
+            start_time=time(15, 30),
+            end_time=time(16, 30),
+            start_date=self.club.start_date,
+            end_date=self.club.end_date,
+            frequency='one-off'
+        )
+        enrollment = reserve_seat(self.child, self.club)
+        join_waitlist(self.other_child, self.club)
+        join_waitlist(third_child, self.club)
+        reserve_seat(self.other_child, clashing)
+
+        promoted = release_seat(enrollment)
+
+        self.assertEqual(
+            [enrollment.child_id for enrollment in promoted],
+            [third_child.id]
+        )
+        self.assertFalse(
+            Enrollment.objects.filter(
+                child=self.other_child, club=self.club
+            ).exists()
+        )
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_capacity_increase_promotes(self):
+        """
+        Raising the capacity should promote as many children as
+        there are new seats.
+        """
+        third_child = Child.objects.create(
+            first_name='Child',
+            surname='Three',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        reserve_seat(self.child, self.club)
+        join_waitlist(self.other_child, self.club)
+        join_waitlist(third_child, self.club)
+
+        self.club.capacity = 2
+        self.club.save()
+        promote_waitlist(self.club)
+
+        self.assertTrue(
+            Enrollment.objects.filter(child=self.other_child).exists()
+        )
+        self.assertEqual(
+            WaitlistEntry.objects.get(child=third_child).position, 1
+        )
+
+    def test_promotion_renumbers_after_stale_entries(self):
+        """
+        Entries of children who got a seat some other way should be
+        dropped and the rest of the queue numbered 1, 2, 3... again.
+        """
+        self.club.capacity = 3
+        self.club.save()
+        children = [
+            Child.objects.create(
+                first_name=f'Queued{number}',
+                surname='Child',
+                date_of_birth=date.today() - timedelta(days=8*365),
+                parent=self.parent
+            )
+            for number in range(1, 7)
+        ]
+        enrollment = reserve_seat(self.child, self.club)
+        for child in children:
+            join_waitlist(child, self.club)
+        reserve_seat(children[1], self.club)
+        second = reserve_seat(children[2], self.club)
+
+        promoted = release_seat(enrollment)
+
+        self.assertEqual(
+            [enrollment.child_id for enrollment in promoted],
+            [children[0].id]
+        )
+        self.assertEqual(
+            list(
+                WaitlistEntry.objects
+                .filter(club=self.club)
+                .values_list('child__first_name', 'position')
+            ),
+            [('Queued4', 1), ('Queued5', 2), ('Queued6', 3)]
+        )
+
+        promoted = release_seat(second)
+
+        self.assertEqual(
+            [enrollment.child_id for enrollment in promoted],
+            [children[3].id]
+        )
+        self.assertEqual(
+            list(
+                WaitlistEntry.objects
+                .filter(club=self.club)
+                .values_list('child__first_name', 'position')
+            ),
+            [('Queued5', 1), ('Queued6', 2)]
+        )
+
+
+class EligibilityMatrixTest(SeatServiceTestBase):
+    def test_matrix_checks_every_child_against_every_club(self):
+        """
+        Each child/club pair should get its own rule results, with the
+        enrolled clubs of all children loaded in a single query.
+        """
+        clash_club = Club.objects.create(
+            teacher=self.teacher,
+            name='Drama Club',
+            description='Acting',
+            min_age=10,
+            max_age=12,
+            capacity=5,
+            start_time=time(15, 30),
+            end_time=time(16, 30),
+            start_date=self.club.start_date,
+            frequency='one-off'
+        )
+        reserve_seat(self.child, self.club)
+        self.club.refresh_from_db()
+
+        with self.assertNumQueries(1):
+            matrix = eligibility_matrix(
+                [self.child, self.other_child], [self.club, clash_club]
+            )
+
+        self.assertEqual(
+            matrix[self.child.pk, self.club.pk].label, 'Enrolled'
+        )
+        self.assertEqual(
+            [code for code, _ in matrix[self.child.pk, clash_club.pk].errors],
+            ['too_young', 'time_clash']
+        )
+        self.assertTrue(matrix[self.other_child.pk, self.club.pk].only_full)
+        self.assertEqual(
+            matrix[self.other_child.pk, clash_club.pk].label, 'Too young'
+        )
+
+
+class MarkRegisterTest(SeatServiceTestBase):
+    def setUp(self):
+        super().setUp()
+        Club.objects.filter(pk=self.club.pk).update(capacity=2)
+        self.club.refresh_from_db()
+        self.first = reserve_seat(self.child, self.club)
+        self.second = reserve_seat(self.other_child, self.club)
+        self.session = ClubSession.objects.create(
+            club=self.club, date=date.today(),
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+
+    def test_register_updates_attendance_totals(self):
+        """
+        Marking a register should record every active enrollment and
+        move the enrollment and club totals.
+        """
+        self.assertEqual(
+            mark_register(self.session, [self.first.pk]), (2, 0)
+        )
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.club.refresh_from_db()
+        self.assertEqual(self.first.attendance_rate, 100)
+        self.assertEqual(self.second.attendance_rate, 0)
+        self.assertEqual(self.club.attendance_rate, 50)
+        self.assertEqual(Attendance.objects.count(), 2)
+
+    def test_correcting_a_register_only_moves_changed_rows(self):
+        """
+        Saving the register again should update the changed rows only,
+        without counting the session twice.
+        """
+        mark_register(self.session, [self.first.pk])
+        self.assertEqual(
+            mark_register(self.session, [self.second.pk]), (0, 2)
+        )
+        self.assertEqual(
+            mark_register(self.session, [self.second.pk]), (0, 0)
+        )
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.club.refresh_from_db()
+        self.assertEqual(
+            (self.first.sessions_marked, self.first.sessions_attended),
+            (1, 0)
+        )
+        self.assertEqual(self.second.attendance_rate, 100)
+        self.assertEqual(
+            (self.club.attendance_marked, self.club.attendance_present),
+            (2, 1)
+        )
+
+    def test_dropped_sessions_leave_the_totals(self):
+        """
+        Registers of sessions deleted by a schedule change should come
+        off the enrollment and club totals.
+        """
+        mark_register(self.session, [self.first.pk, self.second.pk])
+
+        # Today's session is not in the schedule, so it is dropped
+        self.assertEqual(sync_sessions(self.club), (1, 0, 1))
+        kept = self.club.sessions.get()
+        mark_register(kept, [self.first.pk])
+
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.club.refresh_from_db()
+        self.assertEqual(
+            (self.first.sessions_marked, self.first.sessions_attended),
+            (1, 1)
+        )
+        self.assertEqual(
+            (self.second.sessions_marked, self.second.sessions_attended),
+            (1, 0)
+        )
+        self.assertEqual(
+            (self.club.attendance_marked, self.club.attendance_present),
+            (2, 1)
+        )
+        self.assertEqual(Attendance.objects.count(), 2)
+
+    def test_deleted_enrollments_leave_the_totals(self):
+        """
+        Registers of an enrollment deleted along with its child should
+        come off the club totals.
+        """
+        mark_register(self.session, [self.first.pk, self.second.pk])
+        self.other_child.delete()
+
+        self.club.refresh_from_db()
+        self.assertEqual(
+            (self.club.attendance_marked, self.club.attendance_present),
+            (1, 1)
+        )
+        self.assertEqual(Attendance.objects.count(), 1)
@@ -1,10 +1,12 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.core.cache import cache
+from unittest.mock import patch
 from django.contrib.auth import get_user_model
 from datetime import date, time, timedelta
 from club.models import Club
 from child.models import Child
-from enrollment.models import Enrollment
+from enrollment.models import Enrollment, WaitlistEntry
 
 User = get_user_model()
 
@@ -84,7 +86,8 @@ class EnrollmentViewsTest(TestCase):
 
     def test_cancel_enrollment_view(self):
         """
-        POSTing to cancel enrollment should remove it.
+        POSTing to cancel enrollment should mark it cancelled
+        and free its seat.
         """
         enrollment = Enrollment.objects.create(
             child=self.child,
@@ -98,7 +101,11 @@ class EnrollmentViewsTest(TestCase):
             reverse(
                 'enrollment:cancel_enrollment_page'
                 ))
-        self.assertEqual(Enrollment.objects.count(), 0)
+        enrollment.refresh_from_db()
+        self.assertEqual(enrollment.status, 'cancelled')
+        self.assertEqual(Enrollment.objects.active().count(), 0)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.seats_remaining, 2)
 
     def test_cancel_enrollment_page_view(self):
         """
@@ -111,3 +118,344 @@ class EnrollmentViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, self.child.first_name)
         self.assertContains(response, self.club.name)
+
+    def test_create_enrollment_query_budget(self):
+        """
+        One enrollment POST should run a fixed number of queries.
+        """
+        self.client.force_login(self.parent)
+        url = reverse(
+            'enrollment:create_enrollment_with_club',
+            args=[self.club.id]
+            )
+        # session, user, club (404 check), child and club form fields,
+        # the child's clubs, two foreign key checks, then the seat
+        # reservation: savepoint, locked club, insert, counter, release
+        with self.assertNumQueries(13):
+            response = self.client.post(
+                url,
+                {'child': self.child.id,
+                 'club': self.club.id}
+                 )
+        self.assertEqual(response.status_code, 302)
+
+    def test_join_waitlist_view(self):
+        """
+        POSTing to join the waitlist of a full club should queue the child.
+        """
+        other_child = Child.objects.create(
+            first_name='Child',
+            surname='Two',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.club.capacity = 1
+        self.club.save()
+        Enrollment.objects.create(child=other_child, club=self.club)
+
+        self.client.force_login(self.parent)
+        url = reverse('enrollment:join_waitlist', args=[self.club.id])
+        response = self.client.post(url, {'child': self.child.id})
+        self.assertRedirects(
+            response,
+            reverse('enrollment:cancel_enrollment_page')
+            )
+        entry = WaitlistEntry.objects.get(child=self.child)
+        self.assertEqual(entry.position, 1)
+
+    def test_replayed_enrollment_post(self):
+        """
+        Re-submitting with the same idempotency key should replay the
+        first redirect without validating or enrolling again.
+        """
+        cache.clear()
+        self.client.force_login(self.parent)
+        url = reverse('enrollment:create_enrollment')
+        data = {
+            'child': self.child.id,
+            'club': self.club.id,
+            'idempotency_key': 'double-click',
+            }
+        self.client.post(url, data)
+
+        # session and user only
+        with self.assertNumQueries(2):
+            response = self.client.post(url, data)
+        self.assertRedirects(
+            response,
+            reverse('user:parent_dashboard'),
+            fetch_redirect_response=False
+            )
+        self.assertEqual(Enrollment.objects.count(), 1)
+
+    def test_seat_counts_for_polling(self):
+        """
+        The polling endpoint should return the seats of the listed
+        clubs, skipping ids that are not numbers.
+        """
+        self.client.force_login(self.parent)
+        response = self.client.get(
+            reverse('enrollment:seat_counts'), {'clubs': f'{self.club.id},x'}
+        )
+        self.assertEqual(response.json(), {str(self.club.id): 2})
+
+    def test_catalogue_polls_seats_under_wsgi(self):
+        """
+        Without the ASGI deployment the catalogue should poll for seat
+        counts instead of opening a stream.
+        """
+        self.client.force_login(self.parent)
+        response = self.client.get(reverse('child:view_all_clubs'))
+        self.assertContains(response, 'data-seat-poll-url=')
+        self.assertNotContains(response, 'data-seat-stream-url=')
+        with self.settings(ASGI_DEPLOYMENT=True):
+            response = self.client.get(reverse('child:view_all_clubs'))
+        self.assertContains(response, 'data-seat-stream-url=')
+
+
+@override_settings(ENROLLMENT_ADMISSION_RATE=1)
+class AdmissionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.child = Child.objects.create(
+            first_name='Child',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            capacity=2,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=1),
+        )
+        self.client.force_login(self.parent)
+        self.url = reverse(
+            'enrollment:create_enrollment_with_club',
+            args=[self.club.id]
+            )
+        self.data = {'child': self.child.id, 'club': self.club.id}
+
+    def queue_request(self):
+        """
+        Use up this second's only slot, then return the queued response.
+        """
+        with patch('enrollment.admission.time.time', return_value=1000.0):
+            self.client.post(self.url, {'child': self.child.id})
+            return self.client.post(self.url, self.data)
+
+    def test_requests_over_rate_are_queued(self):
+        """
+        POSTs over the admission rate should get the waiting room.
+        """
+        response = self.queue_request()
+        self.assertTemplateUsed(response, 'enrollment/waiting_room.html')
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(Enrollment.objects.count(), 0)
+
+    def test_only_parents_use_up_slots(self):
+        """
+        Requests from other users should be refused before they can
+        take a slot and push parents into the waiting room.
+        """
+        self.client.force_login(self.teacher)
+        with patch('enrollment.admission.time.time', return_value=1000.0):
+            self.assertEqual(
+                self.client.post(self.url, self.data).status_code, 403
+            )
+            self.client.force_login(self.parent)
+            response = self.client.post(self.url, self.data)
+        self.assertRedirects(response, reverse('user:parent_dashboard'))
+
+    def test_ticket_admits_once_slot_arrives(self):
+        """
+        A queued ticket should be polled without queries and let the
+        enrollment through once its slot comes round.
+        """
+        ticket = self.queue_request().context['ticket']
+
+        with patch('enrollment.views.time.time', return_value=1001.0):
+            with self.assertNumQueries(0):
+                status = self.client.get(
+                    reverse('enrollment:admission_status'),
+                    {'ticket': ticket}
+                    ).json()
+        self.assertTrue(status['ready'])
+
+        with patch('enrollment.admission.time.time', return_value=1001.5):
+            response = self.client.post(
+                self.url, {**self.data, 'admission_ticket': ticket}
+                )
+        self.assertRedirects(response, reverse('user:parent_dashboard'))
+        self.assertEqual(Enrollment.objects.count(), 1)
+
+
+@override_settings(ASGI_DEPLOYMENT=True)
+class AsyncEnrollmentViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.child = Child.objects.create(
+            first_name='Child',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.club = Club.objects.create(
+            teacher=self.teacher,
+            name='Chess Club',
+            capacity=2,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+            start_date=date.today() + timedelta(days=1),
+            end_date=date.today() + timedelta(days=1),
+        )
+        self.async_client.force_login(self.parent)
+
+    async def test_async_create_enrollment(self):
+        """
+        POSTing to the async view should enroll the child.
+        """
+        url = reverse(
+            'enrollment:create_enrollment_with_club_async',
+            args=[self.club.id]
+            )
+        response = await self.async_client.post(
+            url, {'child': self.child.id}
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse('user:parent_dashboard'))
+        self.assertEqual(
+            await Enrollment.objects.active().filter(
+                child=self.child, club=self.club
+            ).acount(),
+            1
+        )
+
+    async def test_async_create_rejects_duplicate(self):
+        """
+        The async view should run the same validation pipeline.
+        """
+        await Enrollment.objects.acreate(child=self.child, club=self.club)
+        url = reverse(
+            'enrollment:create_enrollment_with_club_async',
+            args=[self.club.id]
+            )
+        response = await self.async_client.post(
+            url, {'child': self.child.id}
+            )
+        self.assertEqual(response.url, url)
+        self.assertEqual(await Enrollment.objects.acount(), 1)
+
+    async def test_async_cancel_enrollment(self):
+        """
+        POSTing to the async cancel view should cancel the enrollment.
+        """
+        enrollment = await Enrollment.objects.acreate(
+            child=self.child, club=self.club
+            )
+        url = reverse(
+            'enrollment:cancel_enrollment_async', args=[enrollment.id]
+            )
+        await self.async_client.post(url)
+        await enrollment.arefresh_from_db()
+        self.assertEqual(enrollment.status, 'cancelled')
+
+    async def test_seat_stream_starts_with_snapshot(self):
+        """
+        The seat stream should open with the current seat counts.
+        """
+        url = reverse('enrollment:seat_stream')
+        response = await self.async_client.get(
+            url, {'clubs': f'{self.club.id},x'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = response.streaming_content
+        self.assertEqual(await anext(events), b'retry: 3000\n\n')
+        self.assertEqual(
+            await anext(events),
+            f'event: seats\ndata: {{"{self.club.id}": 2}}\n\n'.encode()
+        )
+        await events.aclose()
+
+    @override_settings(ASGI_DEPLOYMENT=False)
+    async def test_async_views_are_not_served_under_wsgi(self):
+        """
+        Without the ASGI deployment the async views would hold a
+        worker, so they should not be served at all.
+        """
+        response = await self.async_client.get(
+            reverse('enrollment:seat_stream'), {'clubs': self.club.id}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.post(
+            reverse(
+                'enrollment:create_enrollment_with_club_async',
+                args=[self.club.id]
+            ),
+            {'child': self.child.id}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_create_replays_a_repeated_submission(self):
+        """
+        A repeated POST with the same idempotency key should get the
+        first response back without enrolling twice.
+        """
+        url = reverse(
+            'enrollment:create_enrollment_with_club_async',
+            args=[self.club.id]
+            )
+        data = {'child': self.child.id, 'idempotency_key': 'once'}
+        first = await self.async_client.post(url, data)
+        second = await self.async_client.post(url, data)
+        self.assertEqual(second.url, first.url)
+        self.assertEqual(await Enrollment.objects.acount(), 1)
+
+    @override_settings(ENROLLMENT_ADMISSION_RATE=1)
+    async def test_async_create_goes_through_admission(self):
+        """
+        POSTs over the admission rate should be queued like the sync
+        view's.
+        """
+        url = reverse(
+            'enrollment:create_enrollment_with_club_async',
+            args=[self.club.id]
+            )
+        with patch('enrollment.admission.time.time', return_value=1000.0):
+            await self.async_client.post(url, {'child': 0})
+            response = await self.async_client.post(
+                url, {'child': self.child.id}
+            )
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(await Enrollment.objects.acount(), 0)
@@ -4,6 +4,15 @@ from .views import (
     create_enrollment_with_club,
     cancel_enrollment,
     cancel_enrollment_page,
+    join_waitlist,
+    leave_waitlist,
+    admission_status,
+    seat_counts,
+)
+from .async_views import (
+    create_enrollment_with_club_async,
+    cancel_enrollment_async,
+    seat_stream,
 )
 
 
@@ -22,4 +31,31 @@ urlpatterns = [
         create_enrollment_with_club,
         name='create_enrollment_with_club'
         ),
+    path(
+        'waitlist/join/<int:club_id>/',
+        join_waitlist,
+        name='join_waitlist'
+        ),
+    path(
+        'waitlist/leave/<int:entry_id>/',
+        leave_waitlist,
+        name='leave_waitlist'
+        ),
+    path(
+        'admission/status/',
+        admission_status,
+        name='admission_status'
+        ),
+    path(
+        'async/create/<int:club_id>/',
+        create_enrollment_with_club_async,
+        name='create_enrollment_with_club_async'
+        ),
+    path(
+        'async/cancel/<int:enrollment_id>/',
+        cancel_enrollment_async,
+        name='cancel_enrollment_async'
+        ),
+    path('seats/', seat_counts, name='seat_counts'),
+    path('seats/stream/', seat_stream, name='seat_stream'),
 ]
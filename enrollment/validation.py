@@ -0,0 +1,178 @@
+from collections import defaultdict
+from datetime import date
+
+from django.db.models import F
+
+from club.models import Club
+from club.schedule import SCHEDULE_FIELDS, ScheduleIndex
+
+
+def age_on(date_of_birth, today):
+    """
+    Return the age in whole years on the given day.
+    """
+    return (
+        today.year - date_of_birth.year
+        - ((today.month, today.day)
+           < (date_of_birth.month, date_of_birth.day))
+    )
+
+
+def enrolled_clubs_for(child):
+    """
+    Clubs a child holds an active seat in, with just the fields the
+    enrollment rules need.
+    """
+    return (
+        Club.objects
+        .filter(enrollments__child=child, enrollments__status='active')
+        .only(*SCHEDULE_FIELDS)
+    )
+
+
+# Badge text for each rule, as shown against a club in the catalogue
+ELIGIBILITY_LABELS = {
+    'too_young': 'Too young',
+    'too_old': 'Too old',
+    'already_enrolled': 'Enrolled',
+    'full': 'Full',
+    'time_clash': 'Time clash',
+}
+
+
+class EnrollmentCheck:
+    """
+    Result of validating one child against one club.
+    Each failed rule adds a (code, message) pair to `errors`.
+    """
+    def __init__(self, child, club):
+        self.child = child
+        self.club = club
+        self.errors = []
+
+    def add(self, code, message):
+        self.errors.append((code, message))
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    @property
+    def messages(self):
+        return [message for _, message in self.errors]
+
+    @property
+    def label(self):
+        """
+        Short badge text for the first failed rule, or 'Eligible'.
+        """
+        if self.is_valid:
+            return 'Eligible'
+        return ELIGIBILITY_LABELS[self.errors[0][0]]
+
+    @property
+    def only_full(self):
+        """
+        True when the club being full is the only rule that failed,
+        so the child could join the club's waitlist instead.
+        """
+        return [code for code, _ in self.errors] == ['full']
+
+
+def validate_enrollment(child, club, enrolled_clubs=None, schedule=None):
+    """
+    Run every enrollment rule for a child and club in a single pass.
+    The child's current clubs are loaded with one query (or taken from
+    `enrolled_clubs`); the capacity check reads the club's seat counter.
+    A prebuilt `schedule` of all the child's clubs may be passed in to
+    reuse it across many clubs.
+    """
+    check = EnrollmentCheck(child, club)
+    name = f"{child.first_name} {child.surname}"
+
+    if enrolled_clubs is None:
+        enrolled_clubs = list(enrolled_clubs_for(child))
+
+    # Age limits
+    if child.date_of_birth is not None:
+        age = age_on(child.date_of_birth, date.today())
+        if club.min_age is not None and age < club.min_age:
+            check.add(
+                'too_young',
+                f"{name} is too young for {club.name}. "
+                f"Minimum age is {club.min_age}."
+            )
+        if club.max_age is not None and age > club.max_age:
+            check.add(
+                'too_old',
+                f"{name} is too old for {club.name}. "
+                f"Maximum age is {club.max_age}."
+            )
+
+    # Already enrolled
+    if any(enrolled.pk == club.pk for enrolled in enrolled_clubs):
+        check.add(
+            'already_enrolled',
+            f"{name} is already enrolled in {club.name}."
+        )
+
+    # Club full, from the live seat counter
+    if club.seats_remaining <= 0:
+        check.add(
+            'full',
+            f"{club.name} has reached its maximum capacity of "
+            f"{club.capacity} children."
+        )
+
+    # Time conflict against every session of the child's other clubs
+    if schedule is None:
+        schedule = ScheduleIndex(
+            enrolled for enrolled in enrolled_clubs
+            if enrolled.pk != club.pk
+        )
+    clashing_club = schedule.clash_with_club(club)
+    # A shared schedule holds the club itself when the child is already
+    # enrolled in it, which is reported above rather than as a clash
+    if clashing_club is not None and clashing_club.pk != club.pk:
+        check.add(
+            'time_clash',
+            f"{name} is already enrolled in "
+            f"{clashing_club.name} which overlaps with {club.name}."
+        )
+
+    return check
+
+
+def eligibility_matrix(children, clubs):
+    """
+    Check every child against every club in one batch and return the
+    results keyed by (child id, club id). The children's enrolled clubs
+    are loaded with a single query and each child's schedule is indexed
+    once, however many clubs are checked.
+    """
+    children = list(children)
+    clubs = list(clubs)
+    if not children or not clubs:
+        return {}
+
+    enrolled = defaultdict(list)
+    for enrolled_club in (
+        Club.objects
+        .filter(
+            enrollments__child__in=children,
+            enrollments__status='active'
+        )
+        .annotate(enrolled_child_id=F('enrollments__child'))
+        .only(*SCHEDULE_FIELDS)
+    ):
+        enrolled[enrolled_club.enrolled_child_id].append(enrolled_club)
+
+    matrix = {}
+    for child in children:
+        enrolled_clubs = enrolled[child.pk]
+        schedule = ScheduleIndex(enrolled_clubs)
+        for club in clubs:
+            matrix[child.pk, club.pk] = validate_enrollment(
+                child, club, enrolled_clubs, schedule
+            )
+    return matrix
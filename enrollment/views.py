@@ -1,17 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
 from user.decorators import role_required
-from datetime import date
+from user.idempotency import idempotent
+from math import ceil
+import time
 from .forms import EnrollmentForm
-from .models import Enrollment
+from .models import Enrollment, WaitlistEntry
+from . import services
+from .admission import admission_required, read_ticket
+from .validation import validate_enrollment
+from child.models import Child
 from club.models import Club
+from club.seats import parse_club_ids
 
 
 @role_required('parent')
+@admission_required
+@idempotent
 def create_enrollment(request):
     """
     Allows a parent to enroll one of their children into a club.
-    Additional server-side validation prevents tampering.
+    Ownership is enforced by limiting the child choices to the parent's
+    children; every other rule runs once in EnrollmentForm.clean.
     """
     if request.method == 'POST':
         form = EnrollmentForm(request.POST)
@@ -20,59 +32,9 @@ def create_enrollment(request):
         form.fields['child'].queryset = request.user.children.all()
 
         if form.is_valid():
-            child = form.cleaned_data['child']
-            club = form.cleaned_data['club']
-
-            # Extra validation: ensure the child belongs to this parent
-            if child.parent != request.user:
-                messages.error(
-                    request,
-                    "You cannot enroll a child that is not yours."
-                    )
-                return redirect('enrollments:create_enrollment')
-
-            # Extra validation: check if already enrolled
-            if Enrollment.objects.filter(child=child, club=club).exists():
-                messages.error(
-                    request,
-                    f"{child.first_name} is already enrolled in {club.name}."
-                    )
-                return redirect('enrollments:create_enrollment')
-
-            # Extra validation: check age against club limits
-            today = date.today()
-            age = (
-                today.year - child.date_of_birth.year
-                - ((today.month, today.day) <
-                   (child.date_of_birth.month, child.date_of_birth.day))
-            )
-            if (
-                club.min_age is not None and age < club.min_age
-                ) or (
-                    club.max_age is not None and age > club.max_age
-                    ):
-                messages.error(
-                    request,
-                    f"{child.first_name} does not meet the age "
-                    "requirements for {club.name}."
-                )
-                return redirect('enrollments:create_enrollment')
-
-            # Extra validation: club capacity
-            current_enrollments = Enrollment.objects.filter(club=club).count()
-            if (
-                club.capacity is not None
-                and current_enrollments >= club.capacity
-            ):
-                messages.error(request, f"{club.name} is already full.")
-                return redirect('enrollments:create_enrollment')
-
-            # All checks passed: save enrollment
-            form.save()
-            messages.success(
-                request,
-                f"{child.first_name} successfully enrolled in {club.name}!")
-            return redirect('user:parent_dashboard')
+            response = _save_enrollment(request, form)
+            if response is not None:
+                return response
         else:
             messages.error(
                 request,
@@ -81,10 +43,15 @@ def create_enrollment(request):
         form = EnrollmentForm()
         form.fields['child'].queryset = request.user.children.all()
 
-    return render(request, 'enrollment/create_enrollment.html', {'form': form})
+    return render(request, 'enrollment/create_enrollment.html', {
+        'form': form,
+        'waitlist_child': _waitlist_child(form),
+    })
 
 
 @role_required('parent')
+@admission_required
+@idempotent
 def create_enrollment_with_club(request, club_id):
     """
     Allows a parent to enroll one of their children into a specific club.
@@ -100,102 +67,189 @@ def create_enrollment_with_club(request, club_id):
         form.fields['child'].queryset = request.user.children.all()
 
         if form.is_valid():
-            child = form.cleaned_data['child']
-            club = form.cleaned_data['club']
-
-            # Ensure child belongs to this parent
-            if child.parent != request.user:
-                messages.error(
-                    request,
-                    "You cannot enroll a child that is not yours."
-                    )
-                return redirect(
-                    'enrollments:create_enrollment_with_club',
-                    club_id=club.id
-                    )
-
-            # Check if already enrolled
-            if Enrollment.objects.filter(child=child, club=club).exists():
-                messages.error(
-                    request,
-                    f"{child.first_name} is already enrolled in {club.name}."
-                    )
-                return redirect(
-                    'enrollments:create_enrollment_with_club',
-                    club_id=club.id
-                    )
-
-            # Check age against club limits
-            today = date.today()
-            age = today.year - child.date_of_birth.year - (
-                (today.month, today.day) <
-                (child.date_of_birth.month, child.date_of_birth.day)
-            )
-            if (club.min_age is not None and age < club.min_age) or \
-               (club.max_age is not None and age > club.max_age):
-                messages.error(
-                    request,
-                    f"{child.first_name} does not meet the "
-                    "age requirements for {club.name}."
-                    )
-                return redirect(
-                    'enrollments:create_enrollment_with_club',
-                    club_id=club.id
-                    )
-
-            # Check club capacity
-            current_enrollments = Enrollment.objects.filter(club=club).count()
-            if (
-                club.capacity is not None
-                and current_enrollments >= club.capacity
-            ):
-                messages.error(request, f"{club.name} is already full.")
-                return redirect(
-                    'enrollments:create_enrollment_with_club',
-                    club_id=club.id
-                    )
-
-            # All checks passed: save enrollment
-            form.save()
-            messages.success(
-                request,
-                f"{child.first_name} successfully enrolled in {club.name}!"
-                )
-            return redirect('user:parent_dashboard')
+            response = _save_enrollment(request, form)
+            if response is not None:
+                return response
         else:
             messages.error(request, "Please correct the errors below.")
     else:
         form = EnrollmentForm(initial=initial_data)
         form.fields['child'].queryset = request.user.children.all()
 
-    return render(request, 'enrollment/create_enrollment.html', {'form': form})
+    return render(request, 'enrollment/create_enrollment.html', {
+        'form': form,
+        'waitlist_child': _waitlist_child(form),
+    })
+
+
+def _save_enrollment(request, form):
+    """
+    Reserve the seat for a validated EnrollmentForm and redirect to the
+    dashboard. If the seat was taken since validation, the error is added
+    to the form and None is returned so the form is shown again.
+    """
+    child = form.cleaned_data['child']
+    club = form.cleaned_data['club']
+    try:
+        form.save()
+    except ValidationError as error:
+        form.add_error(None, error)
+        messages.error(request, "Please correct the errors below.")
+        return None
+
+    messages.success(
+        request,
+        f"{child.first_name} successfully enrolled in {club.name}!"
+        )
+    return redirect('user:parent_dashboard')
+
+
+def _waitlist_child(form):
+    """
+    Return the child to offer a waitlist place to when the only
+    thing stopping the enrollment is that the club is full.
+    """
+    check = getattr(form, 'enrollment_check', None)
+    if check is not None and check.only_full:
+        return check.child
+    return None
 
 
 @role_required('parent')
 def cancel_enrollment_page(request):
     """
-    Show all enrollments for the current user's children
+    Show all enrollments and waitlist places for the current
+    user's children
     """
-    enrollments = Enrollment.objects.filter(child__parent=request.user)
+    enrollments = (
+        Enrollment.objects
+        .active()
+        .filter(child__parent=request.user)
+        .select_related('child', 'club')
+    )
+    waitlist_entries = (
+        WaitlistEntry.objects
+        .filter(child__parent=request.user)
+        .select_related('child', 'club')
+    )
     return render(
         request,
         'enrollment/cancel_enrollment_page.html',
-        {'enrollments': enrollments}
+        {
+            'enrollments': enrollments,
+            'waitlist_entries': waitlist_entries,
+        }
         )
 
 
 @role_required('parent')
 def cancel_enrollment(request, enrollment_id):
     """
-    Cancel an enrollment for a child.
+    Cancel an enrollment for a child and offer the seat to the
+    first child on the club's waitlist.
     """
     enrollment = get_object_or_404(
-        Enrollment,
+        Enrollment.objects.active(),
         id=enrollment_id,
         child__parent=request.user
         )
-    enrollment.delete()
+    services.release_seat(enrollment)
 
     messages.success(request, "Enrollment cancelled successfully!")
 
     return redirect('enrollment:cancel_enrollment_page')
+
+
+@role_required('parent')
+def join_waitlist(request, club_id):
+    """
+    Put a child on the waitlist for a full club.
+    """
+    club = get_object_or_404(Club, id=club_id)
+    if request.method != 'POST':
+        return redirect(
+            'enrollment:create_enrollment_with_club', club_id=club.id
+            )
+
+    child = get_object_or_404(
+        Child,
+        id=request.POST.get('child'),
+        parent=request.user
+        )
+
+    check = validate_enrollment(child, club)
+    if check.is_valid:
+        messages.info(
+            request,
+            f"{club.name} has free seats, so you can enroll directly."
+            )
+        return redirect(
+            'enrollment:create_enrollment_with_club', club_id=club.id
+            )
+    if not check.only_full:
+        for message in check.messages:
+            messages.error(request, message)
+        return redirect(
+            'enrollment:create_enrollment_with_club', club_id=club.id
+            )
+
+    try:
+        entry = services.join_waitlist(child, club)
+    except ValidationError as error:
+        messages.error(request, error.messages[0])
+        return redirect('enrollment:cancel_enrollment_page')
+
+    messages.success(
+        request,
+        f"{child.first_name} is number {entry.position} "
+        f"on the waitlist for {club.name}."
+        )
+    return redirect('enrollment:cancel_enrollment_page')
+
+
+@role_required('parent')
+def leave_waitlist(request, entry_id):
+    """
+    Take a child off a club's waitlist.
+    """
+    entry = get_object_or_404(
+        WaitlistEntry,
+        id=entry_id,
+        child__parent=request.user
+        )
+    if request.method == 'POST':
+        services.leave_waitlist(entry)
+        messages.success(request, "Removed from the waitlist.")
+
+    return redirect('enrollment:cancel_enrollment_page')
+
+
+def admission_status(request):
+    """
+    Tell a queued client whether its admission ticket can be used yet.
+    Polled from the waiting room, so it reads nothing but the ticket.
+    """
+    slot = read_ticket(request.GET.get('ticket', ''))
+    if slot is None:
+        return JsonResponse({'error': 'Invalid ticket.'}, status=400)
+
+    wait = max(slot - time.time(), 0)
+    return JsonResponse({'ready': wait == 0, 'wait': ceil(wait)})
+
+
+@role_required('parent')
+def seat_counts(request):
+    """
+    Return the remaining seats of the clubs listed in ?clubs= as JSON.
+    Polled by the catalogue under WSGI, where the live seat stream is
+    not served; one indexed query per poll.
+    """
+    club_ids = parse_club_ids(request.GET.get('clubs', ''))
+    seats = dict(
+        Club.objects.filter(pk__in=club_ids).values_list(
+            'pk', 'seats_remaining'
+        )
+    )
+    response = JsonResponse(seats)
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,23 @@
+from django.conf import settings
+
+SHARED_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.db.DatabaseCache',
+    # Shared by the workers of one host
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+def cache_timeout(timeout):
+    """
+    Timeout for a cache entry that is kept correct by deleting or
+    patching it when data changes. Those changes reach every worker only
+    through a shared backend; with a per-process one, other workers would
+    serve the old entry until it expired, so it is kept for no longer
+    than LOCAL_CACHE_TIMEOUT.
+    """
+    if settings.CACHES['default']['BACKEND'] in SHARED_BACKENDS:
+        return timeout
+    return min(timeout, settings.LOCAL_CACHE_TIMEOUT)
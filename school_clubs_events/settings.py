@@ -155,3 +155,35 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Dashboards, the child access index, seat notifications and admission
+# counters are kept in the default cache and corrected by deleting or
+# patching entries when data changes. Only a shared backend carries
+# those changes to every worker, so set REDIS_URL in production. Without
+# it each process keeps its own local-memory cache, and entries corrected
+# that way expire after LOCAL_CACHE_TIMEOUT seconds instead (see
+# school_clubs_events.caching.cache_timeout).
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+LOCAL_CACHE_TIMEOUT = 30
+
+# Enrollment POSTs let through per second before parents are queued in
+# the waiting room. The counters live in the default cache, so every
+# worker needs to share one cache backend for this to be a global limit.
+ENROLLMENT_ADMISSION_RATE = int(
+    os.environ.get("ENROLLMENT_ADMISSION_RATE", 20)
+)
+
+# True when served by the ASGI workers of Procfile.asgi. Long-lived
+# responses depend on it: under WSGI, Django reads an async iterator to
+# the end before sending anything, so the live seat stream would hold a
+# worker for minutes and the catalogue polls a JSON endpoint instead;
+# under ASGI, a sync iterator is read into memory first, so the
+# calendar feeds and roster exports are wrapped to stream in batches.
+ASGI_DEPLOYMENT = os.environ.get("ASGI_DEPLOYMENT") == "True"
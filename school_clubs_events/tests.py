@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase, override_settings
+
+from school_clubs_events.caching import cache_timeout
+
+LOCAL_MEMORY = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+}}
+REDIS = {'default': {
+    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    'LOCATION': 'redis://localhost:6379',
+}}
+
+
+class CacheTimeoutTest(SimpleTestCase):
+    @override_settings(CACHES=LOCAL_MEMORY, LOCAL_CACHE_TIMEOUT=30)
+    def test_per_process_cache_keeps_entries_briefly(self):
+        """
+        Without a shared cache, entries corrected on change should
+        expire quickly so other workers catch up.
+        """
+        self.assertEqual(cache_timeout(3600), 30)
+        self.assertEqual(cache_timeout(10), 10)
+
+    @override_settings(CACHES=REDIS)
+    def test_shared_cache_keeps_the_full_timeout(self):
+        """
+        A shared cache carries every correction, so entries should keep
+        their own timeout.
+        """
+        self.assertEqual(cache_timeout(3600), 3600)
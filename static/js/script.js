@@ -39,4 +39,65 @@ document.addEventListener('DOMContentLoaded', () => {
             if (formToSubmit) formToSubmit.submit();
         });
     }
+
+    // --- Enrollment Waiting Room ---
+    const waitingRoomForm = document.getElementById('waitingRoomForm');
+    const waitingRoomSeconds = document.getElementById('waitingRoomSeconds');
+
+    if (waitingRoomForm) {
+        const ticket = waitingRoomForm.querySelector('[name="admission_ticket"]').value;
+        const statusUrl = waitingRoomForm.dataset.statusUrl + '?ticket=' + encodeURIComponent(ticket);
+
+        const pollStatus = () => {
+            fetch(statusUrl)
+                .then(response => response.json())
+                .then(status => {
+                    if (status.ready) {
+                        waitingRoomForm.submit();
+                        return;
+                    }
+                    if (waitingRoomSeconds) waitingRoomSeconds.textContent = status.wait;
+                    setTimeout(pollStatus, Math.min(status.wait, 5) * 1000);
+                })
+                .catch(() => setTimeout(pollStatus, 5000));
+        };
+        pollStatus();
+    }
+
+    // --- Live Seat Counts ---
+    // Streamed under the ASGI deployment, polled under WSGI
+    const clubCatalogue = document.getElementById('clubCatalogue');
+    const SEAT_POLL_INTERVAL = 20000;
+
+    if (clubCatalogue) {
+        const seatCounts = {};
+        clubCatalogue.querySelectorAll('[data-seats-club]').forEach(element => {
+            seatCounts[element.dataset.seatsClub] = element;
+        });
+        const clubIds = Object.keys(seatCounts);
+        const { seatStreamUrl, seatPollUrl } = clubCatalogue.dataset;
+
+        const showSeats = seats => {
+            Object.entries(seats).forEach(([clubId, remaining]) => {
+                if (seatCounts[clubId]) {
+                    seatCounts[clubId].textContent = remaining > 0 ? remaining : 'Full';
+                }
+            });
+        };
+
+        if (clubIds.length && seatStreamUrl && window.EventSource) {
+            const seatStream = new EventSource(seatStreamUrl + '?clubs=' + clubIds.join(','));
+            seatStream.addEventListener('seats', event => showSeats(JSON.parse(event.data)));
+        } else if (clubIds.length && seatPollUrl) {
+            const pollSeats = () => {
+                // Background tabs skip their polls
+                if (document.hidden) return;
+                fetch(seatPollUrl + '?clubs=' + clubIds.join(','))
+                    .then(response => response.json())
+                    .then(showSeats)
+                    .catch(() => {});
+            };
+            setInterval(pollSeats, SEAT_POLL_INTERVAL);
+        }
+    }
 });
\ No newline at end of file
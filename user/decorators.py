@@ -1,13 +1,30 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.http import HttpResponseForbidden
 from functools import wraps
 
 
+def _has_role(user, required_role):
+    return user.is_authenticated and user.role == required_role
+
+
 def role_required(required_role):
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _wrapped_async_view(request, *args, **kwargs):
+                # Resolving the lazy user hits the database, so it has
+                # to run in a thread when the view is async
+                if not await sync_to_async(_has_role)(
+                        request.user, required_role):
+                    return HttpResponseForbidden(
+                        "You are not allowed to access this page."
+                    )
+                return await view_func(request, *args, **kwargs)
+            return _wrapped_async_view
+
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            if (not request.user.is_authenticated
-                    or request.user.role != required_role):
+            if not _has_role(request.user, required_role):
                 return HttpResponseForbidden(
                     "You are not allowed to access this page."
                 )
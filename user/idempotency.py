@@ -0,0 +1,131 @@
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseRedirect
+
+FIELD_NAME = 'idempotency_key'
+# How long a completed submission can be replayed
+RESULT_TIMEOUT = 60 * 60 * 24
+# How long a submission may stay in flight before its key is released
+PENDING_TIMEOUT = 30
+PENDING = 'pending'
+
+
+def _cache_key(request, token):
+    return f'idempotency:{request.user.pk}:{request.path}:{token}'
+
+
+def _replay(request, result):
+    """
+    Rebuild the original redirect and its flash messages.
+    """
+    for level, message in result['messages']:
+        messages.add_message(request, level, message)
+    return HttpResponseRedirect(result['location'])
+
+
+def _wait_for_result(key, timeout=5, interval=0.1):
+    """
+    Wait briefly for a concurrent submission with the same key to finish.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = cache.get(key)
+        if result != PENDING:
+            return result
+        time.sleep(interval)
+    return PENDING
+
+
+def _claim(key):
+    """
+    Claim a token for this submission. Returns None once it is claimed,
+    or the result stored by an earlier submission with the same token
+    (PENDING if that one is still running).
+    """
+    while not cache.add(key, PENDING, timeout=PENDING_TIMEOUT):
+        result = _wait_for_result(key)
+        # None: the earlier attempt failed validation, so this may retry
+        if result is not None:
+            return result
+    return None
+
+
+def _earlier_response(request, result):
+    if result == PENDING:
+        return HttpResponse("This form is still being processed.", status=409)
+    return _replay(request, result)
+
+
+def _store_result(request, key, response):
+    """
+    Keep a successful submission's redirect and messages for replays.
+    """
+    if response.status_code != 302:
+        # Form re-rendered with errors: nothing to replay
+        cache.delete(key)
+        return
+
+    storage = messages.get_messages(request)
+    flashed = [(message.level, message.message) for message in storage]
+    storage.used = False
+    cache.set(key, {
+        'location': response['Location'],
+        'messages': flashed,
+    }, timeout=RESULT_TIMEOUT)
+
+
+def idempotent(view_func):
+    """
+    Make a form POST safe to repeat. The form carries a one-off token
+    (see the `idempotency_field` template tag); the first submission's
+    redirect and messages are stored against it, and a double click or
+    retry with the same token gets them back without re-running the view.
+    Works on sync and async views alike.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _wrapped_async_view(request, *args, **kwargs):
+            token = request.POST.get(FIELD_NAME)
+            if request.method != 'POST' or not token:
+                return await view_func(request, *args, **kwargs)
+
+            # The cache, the user and the message storage are sync-only
+            key = await sync_to_async(_cache_key)(request, token)
+            result = await sync_to_async(_claim)(key)
+            if result is not None:
+                return await sync_to_async(_earlier_response)(
+                    request, result
+                )
+
+            try:
+                response = await view_func(request, *args, **kwargs)
+            except Exception:
+                await sync_to_async(cache.delete)(key)
+                raise
+            await sync_to_async(_store_result)(request, key, response)
+            return response
+        return _wrapped_async_view
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        token = request.POST.get(FIELD_NAME)
+        if request.method != 'POST' or not token:
+            return view_func(request, *args, **kwargs)
+
+        key = _cache_key(request, token)
+        result = _claim(key)
+        if result is not None:
+            return _earlier_response(request, result)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            cache.delete(key)
+            raise
+        _store_result(request, key, response)
+        return response
+    return _wrapped_view
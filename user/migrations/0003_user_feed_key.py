@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-18 16:58
+
+from django.db import migrations, models
+import user.models
+
+
+def backfill_feed_keys(apps, schema_editor):
+    # AddField gave every existing row the same default key
+    User = apps.get_model('user', 'User')
+    rows = list(User.objects.only('pk'))
+    for row in rows:
+        row.feed_key = user.models.new_feed_key()
+    User.objects.bulk_update(rows, ['feed_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_rename_name_user_first_name_user_surname'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='feed_key',
+            field=models.CharField(default=user.models.new_feed_key, editable=False, max_length=32),
+        ),
+        migrations.RunPython(backfill_feed_keys, migrations.RunPython.noop),
+    ]
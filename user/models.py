@@ -1,3 +1,5 @@
+import secrets
+
 from django.db import models
 from django.contrib.auth.models import (
     AbstractBaseUser, PermissionsMixin, BaseUserManager
@@ -5,6 +7,14 @@ from django.contrib.auth.models import (
 from django.utils import timezone
 
 
+def new_feed_key():
+    """
+    Random key behind a user's calendar feed link; replacing it
+    revokes every link given out before.
+    """
+    return secrets.token_urlsafe(24)
+
+
 class UserManager(BaseUserManager):
     """
     Custom manager for the User model with methods
@@ -64,6 +74,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    feed_key = models.CharField(
+        max_length=32, default=new_feed_key, editable=False
+    )
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -73,6 +86,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['role']
 
+    def reset_feed_key(self):
+        """
+        Give the user a new calendar feed link, so an old one that was
+        shared or leaked stops working.
+        """
+        self.feed_key = new_feed_key()
+        self.save(update_fields=['feed_key'])
+
     def __str__(self):
         """
         Return a string representation of the user.
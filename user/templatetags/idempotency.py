@@ -0,0 +1,20 @@
+import uuid
+
+from django import template
+from django.utils.html import format_html
+
+from user.idempotency import FIELD_NAME
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_field():
+    """
+    Render a hidden one-off token so a repeated submit can be replayed.
+    """
+    return format_html(
+        '<input type="hidden" name="{}" value="{}">',
+        FIELD_NAME,
+        uuid.uuid4().hex,
+    )
@@ -1,6 +1,13 @@
 from django.test import TestCase
 from django.urls import reverse
+from django.core.cache import cache
+from datetime import date, time, timedelta
 from user.models import User
+from child.models import Child
+from club.models import Club, ClubSession
+from enrollment.models import Enrollment
+from enrollment.services import release_seat, reserve_seat
+from enrollment.summary import summary_key
 
 
 class SignupViewTests(TestCase):
@@ -39,3 +46,136 @@ class SignupViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Teachers must sign up with an email")
         self.assertEqual(User.objects.count(), 0)
+
+
+class TeacherDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        self.children = [
+            Child.objects.create(
+                first_name=f'Child{i}',
+                surname='One',
+                date_of_birth=date.today() - timedelta(days=8*365),
+                parent=parent
+            )
+            for i in range(2)
+        ]
+        self.clubs = [
+            Club.objects.create(
+                teacher=self.teacher,
+                name=name,
+                capacity=capacity,
+                start_time=time(15, 0),
+                end_time=time(16, 0),
+            )
+            for name, capacity in (('Chess Club', 2), ('Art Club', 10))
+        ]
+        for club in self.clubs:
+            for child in self.children:
+                Enrollment.objects.create(child=child, club=club)
+        ClubSession.objects.create(
+            club=self.clubs[0], date=date.today() + timedelta(days=1),
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+        self.client.login(email='teacher1@example.com', password='pass123')
+        self.url = reverse('user:teacher_dashboard')
+
+    def test_dashboard_shows_club_figures(self):
+        stats = self.client.get(self.url).context['stats']
+        self.assertEqual(stats['children'], 2)
+        self.assertEqual((stats['enrolled'], stats['places']), (4, 12))
+        self.assertEqual(
+            [club['name'] for club in stats['near_capacity']],
+            ['Chess Club']
+        )
+        self.assertEqual(len(stats['upcoming']), 1)
+
+    def test_stats_are_cached_until_an_enrollment_changes(self):
+        self.client.get(self.url)
+        # Session and user only
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+        enrollment = Enrollment.objects.filter(club=self.clubs[0]).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            release_seat(enrollment)
+        stats = self.client.get(self.url).context['stats']
+        self.assertEqual(stats['enrolled'], 3)
+        self.assertEqual(stats['recent_cancellations'], 1)
+        self.assertEqual(stats['near_capacity'], [])
+
+
+class ParentDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(
+            first_name='Parent',
+            surname='One',
+            email='parent1@example.com',
+            password='pass123',
+            role='parent'
+        )
+        teacher = User.objects.create_user(
+            first_name='Teacher',
+            surname='One',
+            email='teacher1@example.com',
+            password='pass123',
+            role='teacher'
+        )
+        self.child = Child.objects.create(
+            first_name='Amy',
+            surname='One',
+            date_of_birth=date.today() - timedelta(days=8*365),
+            parent=self.parent
+        )
+        self.club = Club.objects.create(
+            teacher=teacher,
+            name='Chess Club',
+            capacity=10,
+            start_time=time(15, 0),
+            end_time=time(16, 0),
+        )
+        ClubSession.objects.create(
+            club=self.club, date=date.today() + timedelta(days=2),
+            start_time=time(15, 0), end_time=time(16, 0)
+        )
+        self.client.login(email='parent1@example.com', password='pass123')
+        self.url = reverse('user:parent_dashboard')
+
+    def test_summary_is_rebuilt_when_a_child_enrolls(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Not enrolled in any clubs yet.')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_seat(self.child, self.club)
+        self.assertIsNone(cache.get(summary_key(self.parent.pk)))
+        self.client.get(self.url)
+        # The rebuilt summary is served from the cache alone
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        entry = response.context['summary']['children'][self.child.pk]
+        self.assertEqual(
+            [e['club__name'] for e in entry['enrollments']], ['Chess Club']
+        )
+        self.assertEqual(len(entry['sessions']), 1)
+
+    def test_deleted_child_leaves_the_summary(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['summary']['children'], {})
@@ -18,4 +18,6 @@ urlpatterns = [
          name='teacher_dashboard'),
     path('dashboard/parent/', views.parent_dashboard,
          name='parent_dashboard'),
+    path('dashboard/calendar/reset/', views.reset_calendar_feed,
+         name='reset_calendar_feed'),
 ]
@@ -3,7 +3,11 @@ from django.contrib.auth import get_user_model, logout
 from django.contrib.auth.views import LoginView
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.views.decorators.http import require_POST
+from club.calendar import feed_token
+from club.dashboard import teacher_stats
+from enrollment.summary import parent_summary
 from .forms import SignupForm
 from .decorators import role_required
 import re
@@ -149,22 +153,55 @@ class CustomLoginView(LoginView):
         return super().form_invalid(form)
 
 
+def calendar_feed_url(request):
+    """
+    Absolute URL of the signed-in user's calendar feed.
+    """
+    return request.build_absolute_uri(reverse(
+        'club:calendar_feed',
+        args=[request.user.role, feed_token(request.user)]
+    ))
+
+
 @login_required
 @role_required('teacher')
 def teacher_dashboard(request):
     """
-    Display the teacher's dashboard.
+    Display the teacher's dashboard with figures for their clubs,
+    served from a per-teacher cache.
     """
-    return render(request, 'user/teacher_dashboard.html')
+    return render(request, 'user/teacher_dashboard.html', {
+        'calendar_url': calendar_feed_url(request),
+        'stats': teacher_stats(request.user),
+    })
 
 
 @login_required
 @role_required('parent')
 def parent_dashboard(request):
     """
-    Display the parent's dashboard.
+    Display the parent's dashboard with each child's clubs and next
+    sessions, read from the parent's cached summary.
+    """
+    return render(request, 'user/parent_dashboard.html', {
+        'calendar_url': calendar_feed_url(request),
+        'summary': parent_summary(request.user),
+    })
+
+
+@login_required
+@require_POST
+def reset_calendar_feed(request):
+    """
+    Replace the user's calendar feed link, revoking the old one.
     """
-    return render(request, 'user/parent_dashboard.html')
+    request.user.reset_feed_key()
+    messages.success(
+        request,
+        "Your calendar link has been reset. Subscribe again with the new "
+        "link; the old one no longer works."
+    )
+    return redirect(f'user:{request.user.role}_dashboard')
 
 
 def logout_view(request):